@@ -1,49 +1,131 @@
 """Entry point for python -m motd_gen."""
 
+import argparse
+import importlib
 import sys
 import threading
-import time
-import os
 from pathlib import Path
 from motd_gen.engine import build_motd
+from motd_gen.terminal import ERASE_LINE, detect_capabilities, write_frame
 
 DEFAULT_CONFIG = Path(__file__).parent.parent / "config" / "motd.json"
 
+# Subcommands, imported only when used so the login path stays lean
+COMMANDS = {
+    "bundle": "motd_gen.bundle",
+    "cache-server": "motd_gen.cache_server",
+    "loadtest": "motd_gen.loadtest",
+    "prerender": "motd_gen.prerender",
+}
+
 SPINNER_FRAMES = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
 
+# Only show the spinner if rendering is noticeably slow; a fast MOTD is
+# then written with a single syscall and no spinner traffic at all.
+SPINNER_DELAY = 0.3
+SPINNER_INTERVAL = 0.08
+
 
 def spinner(stop_event: threading.Event) -> None:
     """Animate a spinner until stop_event is set."""
+    if stop_event.wait(SPINNER_DELAY):
+        return
+
     i = 0
     while not stop_event.is_set():
         frame = SPINNER_FRAMES[i % len(SPINNER_FRAMES)]
         sys.stdout.write(f"\r  {frame} Loading MOTD...")
         sys.stdout.flush()
         i += 1
-        stop_event.wait(0.08)
+        stop_event.wait(SPINNER_INTERVAL)
 
     # Clear the spinner line
-    sys.stdout.write("\r" + " " * 30 + "\r")
+    sys.stdout.write(ERASE_LINE)
     sys.stdout.flush()
 
 
-def main() -> None:
-    """Run the MOTD generator."""
-    config_path = str(DEFAULT_CONFIG)
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(prog="motd-gen", description="Generate the MOTD.")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="path to motd.json")
+    capture = parser.add_mutually_exclusive_group()
+    capture.add_argument("--record", metavar="FILE",
+                         help="capture every host input widgets consume into FILE")
+    capture.add_argument("--replay", metavar="FILE",
+                         help="render from a capture file instead of the host")
+    parser.add_argument("--prerendered", action="store_true",
+                        help="print a stored width variant if fresh, rendering only when not")
+    parser.add_argument("--replay-latency", choices=["recorded", "none"], default="recorded",
+                        help="sleep for each input's recorded latency, or not at all")
+    return parser.parse_args(argv)
+
+
+def run_capture(args: argparse.Namespace) -> None:
+    """Render once while recording or replaying host inputs."""
+    # Imported lazily: capture wraps requests and psutil, which the
+    # normal login path should not pay for
+    from motd_gen.capture import Capture
+
+    mode, path = ("record", args.record) if args.record else ("replay", args.replay)
+    with Capture(mode, path, latency=args.replay_latency) as capture:
+        # Workers cannot see the capture hooks, so render in-process
+        motd = build_motd(args.config, isolate=False)
+
+    write_frame(motd, clear=False)
+    if mode == "record":
+        print(f"Recorded {capture.input_count} inputs in {capture.meta['elapsed']:.3f}s to {path}",
+              file=sys.stderr)
+    else:
+        print(f"Replayed {capture.input_count} inputs in {capture.meta['replay_elapsed']:.3f}s "
+              f"(recorded {capture.meta.get('elapsed', 0):.3f}s on {capture.meta.get('hostname', '?')})",
+              file=sys.stderr)
+
+
+def run_prerendered(args: argparse.Namespace) -> None:
+    """Print the stored variant for this terminal, or render and store them."""
+    from motd_gen.prerender import load_variant, prerender, prerender_settings
+
+    width = detect_capabilities().width
+    widths, max_age = prerender_settings(args.config)
+    motd = load_variant(args.config, width, max_age)
+    if motd is None:
+        # Include this terminal's exact width; the collection is shared
+        motd = prerender(args.config, [*widths, width])[width]
+    write_frame(motd, clear=True)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the MOTD generator, or a subcommand such as cache-server or prerender."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        importlib.import_module(COMMANDS[argv[0]]).main(argv[1:])
+        return
+
+    args = parse_args(argv)
+    if args.record or args.replay:
+        run_capture(args)
+        return
+    if args.prerendered:
+        run_prerendered(args)
+        return
 
-    os.system("clear")
+    config_path = args.config
+    caps = detect_capabilities()
 
     stop_event = threading.Event()
-    spin_thread = threading.Thread(target=spinner, args=(stop_event,), daemon=True)
-    spin_thread.start()
+    spin_thread = None
+    if caps.is_tty:
+        spin_thread = threading.Thread(target=spinner, args=(stop_event,), daemon=True)
+        spin_thread.start()
 
     motd = build_motd(config_path)
 
     stop_event.set()
-    spin_thread.join()
+    if spin_thread is not None:
+        spin_thread.join()
 
-    print(motd)
+    write_frame(motd, clear=True)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
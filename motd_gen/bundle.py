@@ -0,0 +1,367 @@
+"""Builds a self-contained zipapp for the login path (``motd-gen bundle``).
+
+The archive holds only the motd_gen modules the given config can reach,
+the third-party packages they import, and the pyfiglet fonts and default
+quotes file it uses, with precompiled bytecode. It runs with
+``python -IS``: no site processing, no virtualenv or user paths, only
+the archive and stdlib.
+
+Packages with C extensions and no pure Python fallback (psutil) cannot
+be imported from a zip, so they are extracted once per archive into a
+private directory under the motd-gen cache on first run.
+
+Bytecode is specific to the interpreter that built the bundle, which is
+also the one written into its shebang.
+"""
+
+import argparse
+import hashlib
+import importlib.machinery
+import importlib.util
+import json
+import modulefinder
+import os
+import py_compile
+import shutil
+import statistics
+import subprocess
+import sys
+import sysconfig
+import tempfile
+import time
+import zipapp
+from pathlib import Path
+from motd_gen.config import load_config
+from motd_gen.engine import WIDGET_MODULES
+
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+
+# Reachable only through subcommands or --record/--replay, never at login
+EXCLUDED_MODULES = ["motd_gen.bundle", "motd_gen.cache_server", "motd_gen.capture",
+                    "motd_gen.loadtest"]
+
+# Subdirectories of third-party packages that are never imported
+SKIPPED_DIRS = {"__pycache__", "tests", "test"}
+
+NATIVE_PREFIX = "_native"
+PROBE_ENV = "MOTD_GEN_BUNDLE_PROBE"
+PROBE_RUNS = 7
+
+LAUNCHER = '''\
+"""motd-gen bundle launcher (generated by motd-gen bundle)."""
+
+import os
+import stat
+import sys
+
+ARCHIVE = os.path.dirname(os.path.abspath(__file__))
+CONFIG = {config!r}
+NATIVE = {native!r}
+WIDGET_MODULES = {widget_modules!r}
+
+
+def _private(path):
+    """Whether ``path`` is a directory of this user's that no one else can enter."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def _extract(parent):
+    """Extract the native packages into a new private directory under ``parent``."""
+    import tempfile
+    import zipfile
+
+    staging = tempfile.mkdtemp(dir=parent)
+    with zipfile.ZipFile(ARCHIVE) as archive:
+        archive.extractall(staging, [n for n in archive.namelist() if n.startswith("{prefix}/")])
+    return staging
+
+
+def _native_dir():
+    """Extract packages that cannot be imported from a zip, once.
+
+    Anything put on sys.path must be writable by the current user only,
+    so the extracted copy is kept in a 0700 directory under the cache and
+    used only if it passes that check. Otherwise the packages go to a
+    private temporary directory removed at exit.
+    """
+    import shutil
+    from motd_gen.cache import cache_dir
+
+    parent = cache_dir() / "native"
+    target = parent / NATIVE
+    try:
+        parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    except OSError:
+        pass
+    if _private(parent):
+        if not os.path.lexists(target):
+            staging = _extract(parent)
+            extracted = os.path.join(staging, "{prefix}")
+            os.chmod(extracted, 0o700)
+            try:
+                os.rename(extracted, target)
+            except OSError:
+                # Another login extracted it first
+                pass
+            shutil.rmtree(staging, ignore_errors=True)
+        if _private(target):
+            return str(target)
+
+    import atexit
+
+    staging = _extract(None)
+    atexit.register(shutil.rmtree, staging, True)
+    return os.path.join(staging, "{prefix}")
+
+
+if ARCHIVE not in sys.path:
+    sys.path.insert(0, ARCHIVE)
+if NATIVE:
+    sys.path.insert(1, _native_dir())
+
+if os.environ.get("{probe_env}"):
+    import importlib
+    import motd_gen.__main__
+    for name in WIDGET_MODULES:
+        importlib.import_module(name)
+    print(len(sys.modules))
+    sys.exit(0)
+
+from motd_gen.__main__ import COMMANDS, main
+
+argv = sys.argv[1:]
+if "--config" not in argv and not (argv and argv[0] in COMMANDS):
+    argv = ["--config", CONFIG, *argv]
+main(argv)
+'''
+
+
+def enabled_widget_modules(config: dict) -> list[str]:
+    """Modules of the widget types the config enables."""
+    modules = []
+    for widget in config["widgets"]:
+        spec = WIDGET_MODULES.get(widget["type"])
+        if spec and widget.get("enabled", True):
+            module = spec.partition(":")[0]
+            if module not in modules:
+                modules.append(module)
+    return modules
+
+
+def find_modules(entry_modules: list[str]) -> dict[str, str]:
+    """Non-stdlib modules statically reachable from ``entry_modules``.
+
+    Returns:
+        {module name: source file} for every motd_gen and third-party
+        module found.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+        f.write("".join(f"import {name}\n" for name in entry_modules))
+        script = f.name
+    try:
+        finder = modulefinder.ModuleFinder(path=[str(PACKAGE_ROOT), *sys.path],
+                                           excludes=EXCLUDED_MODULES)
+        finder.run_script(script)
+    finally:
+        os.unlink(script)
+
+    found = {}
+    for name, module in finder.modules.items():
+        if module.__file__ and name != "__main__" and not _is_stdlib(name, module.__file__):
+            found[name] = module.__file__
+    return found
+
+
+def _is_stdlib(name: str, path: str) -> bool:
+    """Whether a module ships with the interpreter rather than a package."""
+    if name.partition(".")[0] in sys.stdlib_module_names:
+        return True
+    paths = sysconfig.get_paths()
+    path = os.path.realpath(path)
+    # site-packages may live inside the stdlib directory
+    if any(path.startswith(os.path.realpath(paths[key]) + os.sep) for key in ("purelib", "platlib")):
+        return False
+    return any(path.startswith(os.path.realpath(paths[key]) + os.sep) for key in ("stdlib", "platstdlib"))
+
+
+def _has_native_only(directory: Path) -> bool:
+    """Whether a package has extension modules with no .py fallback."""
+    for suffix in importlib.machinery.EXTENSION_SUFFIXES:
+        for extension in directory.rglob(f"*{suffix}"):
+            stem = extension.name[: -len(suffix)]
+            if not (extension.parent / f"{stem}.py").exists():
+                return True
+    return False
+
+
+def _copy_tree(source: Path, target: Path, fonts: set[str] | None = None) -> None:
+    """Copy a package's Python sources and data, skipping tests and caches."""
+    for root, dirs, files in os.walk(source):
+        dirs[:] = [d for d in dirs if d not in SKIPPED_DIRS]
+        rel = Path(root).relative_to(source)
+        for name in files:
+            if fonts is not None and rel.parts[:1] == ("fonts",) and name != "__init__.py":
+                if name.rpartition(".")[0] not in fonts:
+                    continue
+            destination = target / rel / name
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(Path(root) / name, destination)
+
+
+def _compile_tree(root: Path, legacy: bool, skip: str | None = None) -> None:
+    """Precompile every .py under ``root``.
+
+    zipimport only looks for ``module.pyc`` next to the source, while
+    extracted packages use ``__pycache__``. Hash-based, unchecked pycs
+    are never revalidated against the source's timestamp.
+    """
+    for source in root.rglob("*.py"):
+        if skip is not None and skip in source.relative_to(root).parts:
+            continue
+        if legacy:
+            target = source.with_suffix(".pyc")
+        else:
+            target = Path(importlib.util.cache_from_source(str(source)))
+        py_compile.compile(str(source), cfile=str(target), dfile=str(source.relative_to(root)),
+                           doraise=True,
+                           invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+
+
+def stage(config_path: str, staging: Path) -> dict:
+    """Lay out the archive contents in ``staging``.
+
+    Returns:
+        Summary of what was included.
+    """
+    config = load_config(config_path)
+    widget_modules = enabled_widget_modules(config)
+    found = find_modules(["motd_gen.__main__", "motd_gen.engine", *widget_modules])
+
+    fonts = {w.get("font", "slant") for w in config["widgets"]
+             if w["type"] == "hostname" and w.get("enabled", True)}
+
+    own_modules = 0
+    packages, native = [], []
+    for name, source in sorted(found.items()):
+        top = name.partition(".")[0]
+        if top == "motd_gen":
+            rel = Path(source).resolve().relative_to(PACKAGE_ROOT)
+            (staging / rel).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, staging / rel)
+            own_modules += 1
+            continue
+        if top in packages or top in native:
+            continue
+
+        spec = importlib.util.find_spec(top)
+        if not spec.submodule_search_locations:
+            # A single-file top-level module
+            shutil.copy2(spec.origin, staging / Path(spec.origin).name)
+            packages.append(top)
+            continue
+
+        package_dir = Path(list(spec.submodule_search_locations)[0])
+        if _has_native_only(package_dir):
+            _copy_tree(package_dir, staging / NATIVE_PREFIX / top)
+            native.append(top)
+        else:
+            _copy_tree(package_dir, staging / top, fonts if top == "pyfiglet" else None)
+            packages.append(top)
+
+    data_files = []
+    if any(w["type"] == "quote" and w.get("enabled", True) and "quotes_file" not in w
+           for w in config["widgets"]):
+        # QuoteWidget's default file sits next to the package, not in it
+        data_files.append("config/quotes.json")
+    for rel in data_files:
+        (staging / rel).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(PACKAGE_ROOT / rel, staging / rel)
+
+    return {"widget_modules": widget_modules, "motd_gen_modules": own_modules,
+            "packages": packages, "native": native, "fonts": sorted(fonts),
+            "data_files": data_files}
+
+
+def _probe(command: list[str], env: dict[str, str]) -> tuple[float, int]:
+    """Median wall time and module count of the startup probe."""
+    timings, count = [], 0
+    for _ in range(PROBE_RUNS):
+        start = time.perf_counter()
+        result = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+        timings.append(time.perf_counter() - start)
+        count = int(result.stdout.split()[-1])
+    return statistics.median(timings), count
+
+
+def build(config_path: str, output: str) -> dict:
+    """Build the bundle and measure its startup.
+
+    Returns:
+        The stage() summary plus size and startup measurements.
+    """
+    config_path = str(Path(config_path).resolve())
+    with tempfile.TemporaryDirectory(prefix="motd-gen-bundle-") as tmp:
+        staging = Path(tmp) / "app"
+        staging.mkdir()
+        summary = stage(config_path, staging)
+
+        native = ""
+        if summary["native"]:
+            _compile_tree(staging / NATIVE_PREFIX, legacy=False)
+            digest = hashlib.sha1()
+            for path in sorted((staging / NATIVE_PREFIX).rglob("*")):
+                if path.is_file():
+                    digest.update(str(path.relative_to(staging)).encode() + path.read_bytes())
+            # Keyed on content so a rebuilt bundle never reuses stale files
+            native = f"bundle-native-{digest.hexdigest()[:16]}"
+
+        (staging / "__main__.py").write_text(LAUNCHER.format(
+            config=config_path, native=native, prefix=NATIVE_PREFIX, probe_env=PROBE_ENV,
+            widget_modules=summary["widget_modules"]))
+        _compile_tree(staging, legacy=True, skip=NATIVE_PREFIX)
+
+        zipapp.create_archive(staging, output, interpreter=f"{sys.executable} -IS")
+
+    summary["size"] = os.path.getsize(output)
+    env = {key: value for key, value in os.environ.items() if not key.startswith("PYTHON")}
+    env[PROBE_ENV] = "1"
+    summary["startup"], summary["imports"] = _probe([output], env)
+
+    source_probe = ("import importlib, sys, motd_gen.__main__\n"
+                    f"for name in {summary['widget_modules']!r}: importlib.import_module(name)\n"
+                    "print(len(sys.modules))")
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(
+        filter(None, [str(PACKAGE_ROOT), os.environ.get("PYTHONPATH")]))}
+    summary["source_startup"], summary["source_imports"] = _probe(
+        [sys.executable, "-c", source_probe], env)
+    return summary
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run ``motd-gen bundle``."""
+    parser = argparse.ArgumentParser(prog="motd-gen bundle",
+                                     description="Build a minimal zipapp for the login path.")
+    parser.add_argument("--config", default=str(PACKAGE_ROOT / "config" / "motd.json"),
+                        help="config whose enabled widgets to bundle; also the bundle's default")
+    parser.add_argument("-o", "--output", default="motd-gen.pyz", help="archive to write")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    summary = build(args.config, args.output)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"Wrote {args.output} ({summary['size'] / 1024:.0f} KiB): "
+          f"{summary['motd_gen_modules']} motd_gen modules, "
+          f"packages {', '.join(summary['packages']) or 'none'}, "
+          f"fonts {', '.join(summary['fonts']) or 'none'}")
+    if summary["native"]:
+        print(f"  extracted to the cache on first run: {', '.join(summary['native'])}")
+    print(f"  startup {summary['startup'] * 1000:.1f} ms, {summary['imports']} modules imported "
+          f"(source tree: {summary['source_startup'] * 1000:.1f} ms, "
+          f"{summary['source_imports']} modules)")
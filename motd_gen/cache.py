@@ -0,0 +1,110 @@
+"""Persistent on-disk cache shared by widgets and the engine."""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+
+# System-wide directory for entries every user's login can share
+SHARED_CACHE_DIR = "/var/cache/motd-gen"
+
+
+def cache_dir() -> Path:
+    """Return the cache directory, honouring MOTD_GEN_CACHE_DIR and XDG."""
+    override = os.environ.get("MOTD_GEN_CACHE_DIR")
+    if override:
+        return Path(override)
+
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg) if xdg else Path.home() / ".cache"
+    return base / "motd-gen"
+
+
+def shared_cache_dir() -> Path:
+    """Return the directory for cache entries shared across users.
+
+    MOTD_GEN_SHARED_CACHE_DIR wins, then an explicit MOTD_GEN_CACHE_DIR
+    (so tests and captures stay self-contained). Otherwise it is
+    /var/cache/motd-gen when that exists and is writable; an administrator
+    creates it once, e.g. ``install -d -m 2775 -g users /var/cache/motd-gen``.
+    Without it each user falls back to their own cache_dir().
+
+    Anyone with write access can replace entries there, so load_json()
+    only trusts shared entries owned by root or the current user.
+    """
+    override = os.environ.get("MOTD_GEN_SHARED_CACHE_DIR") or os.environ.get("MOTD_GEN_CACHE_DIR")
+    if override:
+        return Path(override)
+    if os.path.isdir(SHARED_CACHE_DIR) and os.access(SHARED_CACHE_DIR, os.W_OK | os.X_OK):
+        return Path(SHARED_CACHE_DIR)
+    return cache_dir()
+
+
+def read_boot_id(path: str = BOOT_ID_PATH) -> str:
+    """Return the kernel boot id, or an empty string if unavailable."""
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def load_json(name: str, shared: bool = False) -> Any:
+    """Load a cached JSON document by name.
+
+    Args:
+        name: File name inside the cache directory.
+        shared: Read from shared_cache_dir() instead of cache_dir(),
+            ignoring entries another user could have written.
+
+    Returns:
+        The decoded document, or None if missing, unreadable or untrusted.
+    """
+    directory = shared_cache_dir() if shared else cache_dir()
+    try:
+        with open(directory / name, "r") as f:
+            if shared and not _trusted(os.fstat(f.fileno())):
+                return None
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _trusted(st: os.stat_result) -> bool:
+    """Whether a shared entry was written by root or the current user.
+
+    Other users share the directory, so their entries could carry forged
+    lines, including escape sequences, into this user's terminal.
+    """
+    return st.st_uid in (0, os.geteuid()) and not st.st_mode & 0o022
+
+
+def save_json(name: str, data: Any, shared: bool = False) -> None:
+    """Atomically write a JSON document into the cache directory.
+
+    With ``shared`` it goes to shared_cache_dir() and is made readable by
+    every user (mode 0644), since other users' logins read it.
+
+    Failures are swallowed: the cache is an optimization, never a
+    reason to break the MOTD.
+    """
+    directory = shared_cache_dir() if shared else cache_dir()
+    tmp_path = None
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.")
+        if shared:
+            # mkstemp creates 0600
+            os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, directory / name)
+    except (OSError, TypeError, ValueError):
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
@@ -0,0 +1,56 @@
+"""Client for the shared cache server (see motd_gen.cache_server)."""
+
+import http.client
+import socket
+from urllib.parse import urlencode, urlsplit
+
+
+class CacheServerError(Exception):
+    """Raised when the cache server is unreachable or returns an error."""
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket."""
+
+    def __init__(self, path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+def fetch(server: str, path: str, params: dict | None = None, timeout: float = 0.5) -> bytes:
+    """GET ``path`` from a cache server and return the body.
+
+    Args:
+        server: "http://host:port" or "unix:/path/to/socket".
+        path: Endpoint path, e.g. "/weather".
+        params: Query parameters forwarded to the upstream API.
+        timeout: Connect and read timeout in seconds.
+
+    Raises:
+        CacheServerError: On connection failure or a non-200 response.
+    """
+    if server.startswith("unix:"):
+        conn: http.client.HTTPConnection = _UnixHTTPConnection(server[len("unix:"):], timeout)
+    else:
+        url = urlsplit(server)
+        conn = http.client.HTTPConnection(url.hostname or "127.0.0.1", url.port, timeout=timeout)
+
+    target = f"{path}?{urlencode(params)}" if params else path
+    try:
+        conn.request("GET", target)
+        response = conn.getresponse()
+        body = response.read()
+    except (OSError, http.client.HTTPException) as e:
+        raise CacheServerError(f"cache server unavailable: {e}") from e
+    finally:
+        conn.close()
+
+    if response.status != 200:
+        raise CacheServerError(f"cache server returned {response.status}")
+    return body
@@ -0,0 +1,214 @@
+"""Shared cache server fronting the weather and public IP upstream APIs.
+
+Many hosts at one site can point their widgets at a single
+``motd-gen cache-server`` instead of each calling Open-Meteo and ipify.
+Responses are kept for a per-endpoint TTL in a bounded LRU, and
+concurrent requests for the same key are coalesced into one upstream call.
+"""
+
+import argparse
+import os
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+import requests
+from motd_gen.ip_resolver import PUBLIC_IP_URL
+from motd_gen.widgets.weather import WeatherWidget
+
+DEFAULT_PORT = 8787
+# Failed upstream calls are remembered briefly so an outage isn't hammered
+NEGATIVE_TTL = 15.0
+
+
+class _Entry:
+    """A cached upstream response, or an in-flight fetch other requests wait on."""
+
+    __slots__ = ("status", "content_type", "body", "expires", "ready")
+
+    def __init__(self) -> None:
+        self.status = 0
+        self.content_type = ""
+        self.body = b""
+        self.expires = 0.0
+        self.ready = threading.Event()
+
+
+class UpstreamCache:
+    """TTL cache with a bounded LRU and single-flight upstream fetches."""
+
+    def __init__(self, routes: dict[str, tuple[str, float]], max_entries: int = 256,
+                 timeout: float = 5.0) -> None:
+        """Configure routes as {path: (upstream_url, ttl_seconds)}."""
+        self.routes = routes
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "upstream_errors": 0}
+
+    def get(self, path: str, params: list[tuple[str, str]]) -> _Entry:
+        """Return a fresh entry for the request, fetching upstream at most once.
+
+        Raises:
+            KeyError: If the path is not a known route.
+        """
+        upstream, ttl = self.routes[path]
+        key = f"{path}?{sorted(params)}"
+
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry is not None and (not entry.ready.is_set() or entry.expires > now):
+                self._entries.move_to_end(key)
+                if entry.ready.is_set():
+                    self.stats["hits"] += 1
+                else:
+                    self.stats["coalesced"] += 1
+                owner = False
+            else:
+                entry = _Entry()
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                self._evict()
+                self.stats["misses"] += 1
+                owner = True
+
+        if owner:
+            self._fetch(entry, upstream, params, ttl)
+        else:
+            entry.ready.wait(self.timeout + 1)
+        return entry
+
+    def _evict(self) -> None:
+        """Drop least recently used completed entries beyond the bound."""
+        while len(self._entries) > self.max_entries:
+            for key, entry in self._entries.items():
+                if entry.ready.is_set():
+                    del self._entries[key]
+                    break
+            else:
+                return
+
+    def _fetch(self, entry: _Entry, upstream: str, params: list[tuple[str, str]], ttl: float) -> None:
+        """Call upstream and publish the result to every waiter."""
+        try:
+            response = requests.get(upstream, params=params, timeout=self.timeout)
+            entry.status = response.status_code
+            entry.content_type = response.headers.get("Content-Type", "text/plain")
+            entry.body = response.content
+            ok = response.status_code < 500
+        except Exception as e:
+            entry.status = 502
+            entry.content_type = "text/plain"
+            entry.body = f"upstream error: {e}".encode()
+            ok = False
+
+        if not ok:
+            with self._lock:
+                self.stats["upstream_errors"] += 1
+        entry.expires = time.monotonic() + (ttl if ok else NEGATIVE_TTL)
+        entry.ready.set()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves cached upstream responses; the cache is set on the server."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        cache: UpstreamCache = self.server.cache  # type: ignore[attr-defined]
+
+        if url.path == "/stats":
+            self._send(200, "text/plain", repr(cache.stats).encode())
+            return
+
+        try:
+            entry = cache.get(url.path, parse_qsl(url.query))
+        except KeyError:
+            self._send(404, "text/plain", b"unknown endpoint")
+            return
+
+        if not entry.ready.is_set():
+            self._send(504, "text/plain", b"upstream still pending")
+            return
+        self._send(entry.status, entry.content_type, entry.body)
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no address tuple
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded HTTP server on a Unix domain socket."""
+
+    daemon_threads = True
+
+    def server_bind(self) -> None:
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+def make_server(cache: UpstreamCache, listen: str | None = None,
+                socket_path: str | None = None) -> socketserver.BaseServer:
+    """Create the HTTP server on a TCP address or a Unix socket path."""
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server: Any = _UnixHTTPServer(socket_path, _Handler)
+        os.chmod(socket_path, 0o666)
+    else:
+        host, _, port = (listen or f"127.0.0.1:{DEFAULT_PORT}").rpartition(":")
+        server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), _Handler)
+        server.daemon_threads = True
+    server.cache = cache
+    return server
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run ``motd-gen cache-server``."""
+    parser = argparse.ArgumentParser(prog="motd-gen cache-server",
+                                     description="Shared cache for weather and public IP lookups.")
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument("--listen", default=f"127.0.0.1:{DEFAULT_PORT}", help="HOST:PORT to listen on")
+    where.add_argument("--socket", help="Unix socket path to listen on instead")
+    parser.add_argument("--weather-ttl", type=float, default=600, help="seconds to keep weather")
+    parser.add_argument("--public-ip-ttl", type=float, default=300, help="seconds to keep public IP")
+    parser.add_argument("--max-entries", type=int, default=256, help="LRU bound")
+    parser.add_argument("--timeout", type=float, default=5, help="upstream timeout in seconds")
+    parser.add_argument("--weather-upstream", default=WeatherWidget.API_URL)
+    parser.add_argument("--public-ip-upstream", default=PUBLIC_IP_URL)
+    args = parser.parse_args(argv)
+
+    cache = UpstreamCache(
+        {
+            "/weather": (args.weather_upstream, args.weather_ttl),
+            "/public-ip": (args.public_ip_upstream, args.public_ip_ttl),
+        },
+        max_entries=args.max_entries,
+        timeout=args.timeout,
+    )
+    server = make_server(cache, listen=None if args.socket else args.listen, socket_path=args.socket)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
@@ -0,0 +1,422 @@
+"""Record and replay of the external inputs widgets consume.
+
+Recording wraps the boundaries through which widgets observe the host
+(subprocess.run, update-motd scripts, requests.get, reads of /proc, /sys,
+/etc, /var and /run including positioned os.pread reads, directory
+listings, stat and access checks, psutil queries, disk probes, uname)
+and stores every result with its latency in a single JSON capture file.
+Replaying serves the same results back, optionally with the recorded
+latencies, so build_motd can be profiled offline on another machine.
+"""
+
+import base64
+import builtins
+import importlib
+import io
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable
+import psutil
+import requests
+from motd_gen import engine, facts
+from motd_gen.widgets import system_stats, update_motd
+
+CAPTURE_VERSION = 1
+
+# Only reads below these prefixes are host inputs; everything else
+# (Python modules, pyfiglet fonts, the config) is read normally.
+HOST_PREFIXES = ("/proc/", "/sys/", "/etc/", "/var/", "/run/", "/dev/", "/usr/lib/os-release")
+
+# Fixed seed so random choices (e.g. the quote) match between runs
+RANDOM_SEED = 0
+
+
+class CaptureMissError(LookupError):
+    """Raised on replay when an input was never recorded."""
+
+
+def _is_host_path(path: Any) -> bool:
+    """Whether a path argument refers to host state worth capturing."""
+    if isinstance(path, int):
+        return False
+    path = os.fsdecode(os.fspath(path))
+    return path.startswith(HOST_PREFIXES) or path in ("/proc", "/sys", "/etc")
+
+
+def _encode_bytes(value: str | bytes | None) -> Any:
+    """Make subprocess/HTTP payloads JSON-safe."""
+    if isinstance(value, bytes):
+        return {"b64": base64.b64encode(value).decode("ascii")}
+    return value
+
+
+def _decode_bytes(value: Any) -> str | bytes | None:
+    """Inverse of _encode_bytes."""
+    if isinstance(value, dict):
+        return base64.b64decode(value["b64"])
+    return value
+
+
+def _encode_value(value: Any) -> Any:
+    """Encode psutil results: namedtuples become {"nt": type, "f": fields}."""
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        cls = type(value)
+        return {"nt": f"{cls.__module__}:{cls.__qualname__}",
+                "f": [_encode_value(v) for v in value]}
+    if isinstance(value, list):
+        return [_encode_value(v) for v in value]
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """Inverse of _encode_value."""
+    if isinstance(value, dict) and "nt" in value:
+        module, name = value["nt"].split(":")
+        cls = getattr(importlib.import_module(module), name)
+        return cls(*(_decode_value(v) for v in value["f"]))
+    if isinstance(value, list):
+        return [_decode_value(v) for v in value]
+    return value
+
+
+def _encode_disks(results: dict[str, Any]) -> dict[str, Any]:
+    """Encode disk probe results; probe errors become {"error": message}."""
+    return {path: {"error": str(value)} if isinstance(value, Exception) else _encode_value(value)
+            for path, value in results.items()}
+
+
+def _decode_disks(raw: dict[str, Any]) -> dict[str, Any]:
+    """Inverse of _encode_disks."""
+    return {path: OSError(value["error"]) if isinstance(value, dict) and "error" in value
+            else _decode_value(value) for path, value in raw.items()}
+
+
+def _rebuild_error(entry: dict) -> Exception:
+    """Recreate a recorded exception, falling back to a generic one."""
+    qualname, message = entry["error"]
+    module, _, name = qualname.rpartition(".")
+    try:
+        cls = getattr(importlib.import_module(module), name)
+        if "errno" in entry:
+            # Keeps errno and strerror, which widgets show
+            return cls(*entry["errno"])
+        if issubclass(cls, subprocess.TimeoutExpired):
+            # Takes (cmd, timeout); callers only check the type
+            return cls(message, 0)
+        return cls(message)
+    except Exception:
+        return RuntimeError(f"{qualname}: {message}")
+
+
+class Capture:
+    """Context manager that records or replays host inputs.
+
+    Args:
+        mode: "record" or "replay".
+        path: Capture file to write or read.
+        latency: On replay, "recorded" to sleep for each input's recorded
+            latency, or "none" to return immediately.
+    """
+
+    def __init__(self, mode: str, path: str, latency: str = "recorded") -> None:
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown capture mode: {mode}")
+        self.mode = mode
+        self.path = path
+        self.latency = latency
+        self.events: dict[str, list[dict]] = {}
+        self.renders: list[dict] = []
+        self.meta: dict[str, Any] = {}
+        self._cursor: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._patches: list[tuple[Any, str, Any]] = []
+        self._fds: dict[int, str] = {}
+        self._cache_dir = ""
+        self._saved_env: str | None = None
+        self._started = 0.0
+
+        if mode == "replay":
+            with open(path, "r") as f:
+                data = json.load(f)
+            if data.get("version") != CAPTURE_VERSION:
+                raise ValueError(f"Unsupported capture version: {data.get('version')}")
+            self.events = data["events"]
+            self.renders = data.get("renders", [])
+            self.meta = data.get("meta", {})
+
+    def __enter__(self) -> "Capture":
+        # Start from an empty cache so record and replay take the same path
+        self._cache_dir = tempfile.mkdtemp(prefix="motd-gen-capture-")
+        self._saved_env = os.environ.get("MOTD_GEN_CACHE_DIR")
+        os.environ["MOTD_GEN_CACHE_DIR"] = self._cache_dir
+        facts._facts = None
+        random.seed(RANDOM_SEED)
+
+        self._install()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        elapsed = time.perf_counter() - self._started
+        for target, attr, original in reversed(self._patches):
+            setattr(target, attr, original)
+        self._patches = []
+
+        if self._saved_env is None:
+            os.environ.pop("MOTD_GEN_CACHE_DIR", None)
+        else:
+            os.environ["MOTD_GEN_CACHE_DIR"] = self._saved_env
+        shutil.rmtree(self._cache_dir, ignore_errors=True)
+        facts._facts = None
+
+        if self.mode == "record":
+            self.meta.update({"hostname": socket.gethostname(),
+                              "recorded_at": time.time(), "elapsed": elapsed})
+            data = {"version": CAPTURE_VERSION, "meta": self.meta,
+                    "renders": self.renders, "events": self.events}
+            with open(self.path, "w") as f:
+                json.dump(data, f, indent=1)
+        else:
+            self.meta["replay_elapsed"] = elapsed
+
+    @property
+    def input_count(self) -> int:
+        """Total number of recorded inputs."""
+        return sum(len(entries) for entries in self.events.values())
+
+    def _patch(self, target: Any, attr: str, wrapper: Any) -> None:
+        self._patches.append((target, attr, getattr(target, attr)))
+        setattr(target, attr, wrapper)
+
+    def _install(self) -> None:
+        """Wrap every input boundary."""
+        self._patch(engine, "_render_widget", self._wrap_render(engine._render_widget))
+        self._patch(engine, "detect_terminal_width", self._wrap(
+            "width", engine.detect_terminal_width, lambda: "", _identity, _identity))
+
+        self._patch(subprocess, "run", self._wrap(
+            "run", subprocess.run, lambda cmd, *a, **k: json.dumps(cmd),
+            _completed_to_raw, _raw_to_completed))
+
+        self._patch(requests, "get", self._wrap(
+            "http", requests.get,
+            lambda url, params=None, **k: f"{url} {json.dumps(params, sort_keys=True)}",
+            _response_to_raw, _raw_to_response))
+
+        self._patch(builtins, "open", self._wrap(
+            "open", builtins.open,
+            lambda path, mode="r", *a, **k: f"{os.fsdecode(os.fspath(path))} {mode}",
+            _read_stream, _to_stream,
+            applies=lambda path, mode="r", *a, **k: "r" in mode and "+" not in mode
+            and _is_host_path(path)))
+
+        for name in ("listdir", "readlink"):
+            self._patch(os, name, self._wrap(
+                name, getattr(os, name), lambda path=".", *a, **k: os.fsdecode(os.fspath(path)),
+                _identity, _identity, applies=lambda path=".", *a, **k: _is_host_path(path)))
+
+        self._patch(os, "access", self._wrap(
+            "access", os.access, lambda path, mode, *a, **k: f"{os.fsdecode(os.fspath(path))} {mode}",
+            _identity, _identity, applies=lambda path, *a, **k: _is_host_path(path)))
+
+        # Descriptors of host files opened with os.open, for os.pread
+        self._patch(os, "open", self._wrap_fd_open(os.open))
+        self._patch(os, "pread", self._wrap(
+            "pread", os.pread, lambda fd, n, offset: f"{self._fds[fd]} {n} {offset}",
+            _encode_bytes, _decode_bytes, applies=lambda fd, *a, **k: fd in self._fds))
+        self._patch(os, "close", self._wrap_fd_close(os.close))
+
+        self._patch(update_motd, "run_script", self._wrap(
+            "script", update_motd.run_script, lambda path, timeout: path, _identity, _identity))
+
+        self._patch(os, "stat", self._wrap(
+            "stat", os.stat, lambda path, *a, **k: os.fsdecode(os.fspath(path)),
+            _stat_to_raw, lambda raw: SimpleNamespace(**raw),
+            applies=lambda path, *a, **k: _is_host_path(path)))
+
+        self._patch(system_stats, "start_disk_probes",
+                    self._wrap_disk_probes(system_stats.start_disk_probes))
+
+        for name in ("cpu_percent", "virtual_memory", "disk_usage", "disk_partitions", "pids"):
+            self._patch(psutil, name, self._wrap(
+                f"psutil.{name}", getattr(psutil, name),
+                lambda *a, **k: json.dumps([a, k], sort_keys=True, default=str),
+                _encode_value, _decode_value))
+
+        self._patch(os, "uname", self._wrap(
+            "uname", os.uname, lambda: "", list, os.uname_result))
+        self._patch(os, "cpu_count", self._wrap(
+            "cpu_count", os.cpu_count, lambda: "", _identity, _identity))
+
+    def _wrap_render(self, original: Callable) -> Callable:
+        """Attribute inputs to the widget being rendered and time each render."""
+        def wrapper(widget_config: dict, width: int, *args: Any, **kwargs: Any) -> Any:
+            self._local.widget = widget_config.get("type", "?")
+            start = time.perf_counter()
+            try:
+                return original(widget_config, width, *args, **kwargs)
+            finally:
+                if self.mode == "record":
+                    with self._lock:
+                        self.renders.append({"widget": self._local.widget,
+                                             "elapsed": time.perf_counter() - start})
+                self._local.widget = None
+        return wrapper
+
+    def _wrap_disk_probes(self, original: Callable) -> Callable:
+        """Record or replay what the disk probe process reports.
+
+        The probes return a collector that is called later, so the event
+        is recorded when it is collected, not when the probes start.
+        """
+        def wrapper(paths: list[str], timeout: float) -> Callable[[], dict[str, Any]]:
+            event_key = f"disks:{json.dumps(paths)}"
+            if self.mode == "replay":
+                return lambda: _decode_disks(self._replay(event_key))
+            collect = original(paths, timeout)
+            return lambda: _decode_disks(self._record(event_key, lambda: _encode_disks(collect())))
+        return wrapper
+
+    def _wrap_fd_open(self, original: Callable) -> Callable:
+        """Record or replay read-only os.open of host paths.
+
+        Only success or the error is recorded. On replay the caller gets
+        a descriptor for /dev/null, and os.pread on it replays the reads
+        recorded for the real file.
+        """
+        def wrapper(path: Any, flags: int, *args: Any, **kwargs: Any) -> int:
+            if flags & (os.O_WRONLY | os.O_RDWR) or not _is_host_path(path):
+                return original(path, flags, *args, **kwargs)
+            name = os.fsdecode(os.fspath(path))
+            if self.mode == "replay":
+                self._replay(f"os.open:{name}")
+                fd = original(os.devnull, os.O_RDONLY)
+            else:
+                opened: list[int] = []
+                self._record(f"os.open:{name}",
+                             lambda: opened.append(original(path, flags, *args, **kwargs)))
+                fd = opened[0]
+            self._fds[fd] = name
+            return fd
+        return wrapper
+
+    def _wrap_fd_close(self, original: Callable) -> Callable:
+        """Forget a host descriptor on close so a reused number is not replayed."""
+        def wrapper(fd: int) -> None:
+            self._fds.pop(fd, None)
+            original(fd)
+        return wrapper
+
+    def _wrap(self, kind: str, original: Callable, key: Callable, encode: Callable,
+              build: Callable, applies: Callable | None = None) -> Callable:
+        """Build a wrapper that records ``original``'s results or replays them.
+
+        Args:
+            kind: Prefix of the event key, e.g. "run" or "open".
+            original: The real function.
+            key: Maps call arguments to the key identifying the input.
+            encode: Turns the real result into JSON-safe data.
+            build: Turns stored data back into the value callers expect.
+            applies: Optional filter; calls it rejects go straight to ``original``.
+        """
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if applies is not None and not applies(*args, **kwargs):
+                return original(*args, **kwargs)
+            event_key = f"{kind}:{key(*args, **kwargs)}"
+            if self.mode == "replay":
+                return build(self._replay(event_key))
+            return build(self._record(event_key, lambda: encode(original(*args, **kwargs))))
+        return wrapper
+
+    def _record(self, event_key: str, call: Callable[[], Any]) -> Any:
+        """Run the real call and store its result or exception."""
+        entry: dict[str, Any] = {"widget": getattr(self._local, "widget", None)}
+        start = time.perf_counter()
+        try:
+            raw = call()
+        except Exception as e:
+            cls = type(e)
+            entry["error"] = [f"{cls.__module__}.{cls.__qualname__}", str(e)]
+            if isinstance(e, OSError) and e.errno is not None:
+                entry["errno"] = [e.errno, e.strerror, e.filename]
+            raise
+        else:
+            entry["value"] = raw
+            return raw
+        finally:
+            entry["elapsed"] = round(time.perf_counter() - start, 6)
+            with self._lock:
+                self.events.setdefault(event_key, []).append(entry)
+
+    def _replay(self, event_key: str) -> Any:
+        """Return the next recorded result for a key, in recorded order."""
+        with self._lock:
+            entries = self.events.get(event_key)
+            if not entries:
+                raise CaptureMissError(f"no recorded input for {event_key}")
+            index = self._cursor.get(event_key, 0)
+            # Repeat the last result if a run makes more calls than recorded
+            entry = entries[min(index, len(entries) - 1)]
+            self._cursor[event_key] = index + 1
+
+        if self.latency == "recorded":
+            time.sleep(entry.get("elapsed", 0))
+        if "error" in entry:
+            raise _rebuild_error(entry)
+        return entry["value"]
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _completed_to_raw(result: subprocess.CompletedProcess) -> dict:
+    return {"args": result.args, "returncode": result.returncode,
+            "stdout": _encode_bytes(result.stdout), "stderr": _encode_bytes(result.stderr)}
+
+
+def _raw_to_completed(raw: dict) -> subprocess.CompletedProcess:
+    return subprocess.CompletedProcess(raw["args"], raw["returncode"],
+                                       _decode_bytes(raw["stdout"]), _decode_bytes(raw["stderr"]))
+
+
+def _response_to_raw(response: requests.Response) -> dict:
+    return {"url": response.url, "status": response.status_code,
+            "headers": dict(response.headers), "encoding": response.encoding,
+            "content": _encode_bytes(response.content)}
+
+
+def _raw_to_response(raw: dict) -> requests.Response:
+    response = requests.Response()
+    response.url = raw["url"]
+    response.status_code = raw["status"]
+    response.headers.update(raw["headers"])
+    response.encoding = raw["encoding"]
+    response._content = _decode_bytes(raw["content"])
+    return response
+
+
+def _read_stream(f: io.IOBase) -> Any:
+    """Read and close a whole file, returning JSON-safe content."""
+    with f:
+        return _encode_bytes(f.read())
+
+
+def _to_stream(raw: Any) -> io.IOBase:
+    content = _decode_bytes(raw)
+    return io.BytesIO(content) if isinstance(content, bytes) else io.StringIO(content)
+
+
+def _stat_to_raw(st: os.stat_result) -> dict:
+    fields = ("st_mode", "st_ino", "st_dev", "st_nlink", "st_uid", "st_gid",
+              "st_size", "st_mtime", "st_mtime_ns", "st_ctime")
+    return {name: getattr(st, name) for name in fields}
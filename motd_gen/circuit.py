@@ -0,0 +1,130 @@
+"""Persisted circuit breaker with latency-adaptive timeouts for network calls."""
+
+import re
+import time
+from typing import Any, Callable, TypeVar
+from motd_gen.cache import load_json, save_json
+
+T = TypeVar("T")
+
+# Number of recent successful latencies kept per endpoint
+LATENCY_SAMPLES = 20
+# Samples needed before the timeout starts adapting
+MIN_SAMPLES = 5
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is skipped because the endpoint's circuit is open."""
+
+    def __init__(self, endpoint: str, retry_in: float) -> None:
+        super().__init__(f"{endpoint} offline, retry in {retry_in:.0f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class CircuitBreaker:
+    """Tracks failures and latencies for one endpoint across runs.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are skipped for a backoff window that doubles with each further
+    failure, up to ``max_backoff``. The last successful value is kept so
+    widgets can show it while the endpoint is unreachable.
+
+    Recognised widget config keys: ``circuit_breaker`` (bool),
+    ``failure_threshold``, ``backoff``, ``max_backoff`` and ``min_timeout``.
+    """
+
+    def __init__(self, endpoint: str, config: dict[str, Any]) -> None:
+        """Load persisted state for an endpoint."""
+        self.endpoint = endpoint
+        self.enabled = config.get("circuit_breaker", True)
+        self.threshold = config.get("failure_threshold", 2)
+        self.base_backoff = config.get("backoff", 30)
+        self.max_backoff = config.get("max_backoff", 3600)
+        self.min_timeout = config.get("min_timeout", 0.5)
+
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", endpoint)
+        self._cache_name = f"circuit-{slug}.json"
+        state = load_json(self._cache_name) if self.enabled else None
+        self._state: dict[str, Any] = state if isinstance(state, dict) else {}
+
+    @property
+    def last_value(self) -> Any:
+        """The value from the most recent successful call, if any."""
+        return self._state.get("value")
+
+    def retry_in(self) -> float:
+        """Seconds until the circuit allows another attempt."""
+        return max(0.0, self._state.get("open_until", 0) - time.time())
+
+    def allow(self) -> bool:
+        """Whether a call should be attempted now."""
+        return not self.enabled or self.retry_in() <= 0
+
+    def timeout(self, ceiling: float) -> float:
+        """Timeout derived from observed latency, never above ``ceiling``.
+
+        Uses three times the p95 of recent successful calls, so a fast
+        network fails fast while a slow one keeps the configured limit.
+        """
+        latencies = self._state.get("latencies", [])
+        if not self.enabled or len(latencies) < MIN_SAMPLES:
+            return ceiling
+        adaptive = _percentile(latencies, 95) * 3
+        return min(ceiling, max(self.min_timeout, adaptive))
+
+    def record_success(self, latency: float, value: Any = None) -> None:
+        """Close the circuit and remember the latency and value."""
+        if not self.enabled:
+            return
+        latencies = self._state.get("latencies", [])
+        latencies = (latencies + [round(latency, 4)])[-LATENCY_SAMPLES:]
+        self._state = {"failures": 0, "open_until": 0, "latencies": latencies,
+                       "value": value, "value_time": time.time()}
+        save_json(self._cache_name, self._state)
+
+    def record_failure(self) -> None:
+        """Count a failure and open the circuit once the threshold is reached."""
+        if not self.enabled:
+            return
+        failures = self._state.get("failures", 0) + 1
+        self._state["failures"] = failures
+        if failures >= self.threshold:
+            # A tight adaptive timeout may have caused this; retry at full length
+            self._state["latencies"] = []
+            backoff = self.base_backoff * 2 ** (failures - self.threshold)
+            self._state["open_until"] = time.time() + min(backoff, self.max_backoff)
+        save_json(self._cache_name, self._state)
+
+    def call(self, fetch: Callable[[float], T], ceiling: float) -> T:
+        """Run ``fetch(timeout)`` through the breaker.
+
+        Args:
+            fetch: Callable performing the request with the given timeout.
+            ceiling: The configured maximum timeout in seconds.
+
+        Returns:
+            Whatever ``fetch`` returns; it is also stored as last_value.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+            Exception: Whatever ``fetch`` raised, after recording the failure.
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.endpoint, self.retry_in())
+
+        start = time.monotonic()
+        try:
+            value = fetch(self.timeout(ceiling))
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success(time.monotonic() - start, value)
+        return value
@@ -1,48 +1,65 @@
 """Core engine that loads config, resolves widgets, and assembles output."""
 
+import importlib
 import os
 import re
+import threading
+import time
+from collections.abc import Iterator, Mapping
+from typing import Any, Callable
 from motd_gen.config import load_config
-from motd_gen.widgets.base import BaseWidget
-from motd_gen.widgets.uptime import UptimeWidget
-from motd_gen.widgets.system_stats import SystemStatsWidget
-from motd_gen.widgets.hostname import HostnameWidget
-from motd_gen.widgets.weather import WeatherWidget
-from motd_gen.widgets.quote import QuoteWidget
-from motd_gen.widgets.network import NetworkWidget
-from motd_gen.widgets.last_login import LastLoginWidget
-from motd_gen.widgets.updates import UpdatesWidget
-from motd_gen.widgets.separator import SeparatorWidget
-from motd_gen.widgets.public_ip import PublicIPWidget
-from motd_gen.widgets.temperature import TemperatureWidget
-from motd_gen.widgets.processes import ProcessesWidget
-from motd_gen.widgets.users import UsersWidget
-from motd_gen.widgets.os_info import OSInfoWidget
-
-WIDGET_REGISTRY: dict[str, type[BaseWidget]] = {
-    "uptime": UptimeWidget,
-    "system_stats": SystemStatsWidget,
-    "hostname": HostnameWidget,
-    "weather": WeatherWidget,
-    "quote": QuoteWidget,
-    "network": NetworkWidget,
-    "last_login": LastLoginWidget,
-    "updates": UpdatesWidget,
-    "separator": SeparatorWidget,
-    "public_ip": PublicIPWidget,
-    "temperature": TemperatureWidget,
-    "processes": ProcessesWidget,
-    "users": UsersWidget,
-    "os_info": OSInfoWidget,
+from motd_gen.facts import get_facts
+from motd_gen.isolation import DEFAULT_TIMEOUT, WidgetPool, pool_size
+from motd_gen.load_policy import LoadPolicy
+from motd_gen.singleflight import FAILURE_TTL, cache_key, load_cached, render_single_flight
+from motd_gen.terminal import detect_capabilities
+from motd_gen.watch import dependency_token, use_inotify
+from motd_gen.widgets.base import BaseWidget, RenderFailure
+
+# "module:Class" for each widget type. Modules are imported on first use,
+# so a run only pays for the widgets its config enables.
+WIDGET_MODULES: dict[str, str] = {
+    "uptime": "motd_gen.widgets.uptime:UptimeWidget",
+    "system_stats": "motd_gen.widgets.system_stats:SystemStatsWidget",
+    "hostname": "motd_gen.widgets.hostname:HostnameWidget",
+    "weather": "motd_gen.widgets.weather:WeatherWidget",
+    "quote": "motd_gen.widgets.quote:QuoteWidget",
+    "network": "motd_gen.widgets.network:NetworkWidget",
+    "last_login": "motd_gen.widgets.last_login:LastLoginWidget",
+    "updates": "motd_gen.widgets.updates:UpdatesWidget",
+    "separator": "motd_gen.widgets.separator:SeparatorWidget",
+    "public_ip": "motd_gen.widgets.public_ip:PublicIPWidget",
+    "temperature": "motd_gen.widgets.temperature:TemperatureWidget",
+    "processes": "motd_gen.widgets.processes:ProcessesWidget",
+    "users": "motd_gen.widgets.users:UsersWidget",
+    "os_info": "motd_gen.widgets.os_info:OSInfoWidget",
+    "update_motd": "motd_gen.widgets.update_motd:UpdateMotdWidget",
 }
 
 
+class _WidgetRegistry(Mapping):
+    """Read-only mapping of widget type to class that imports on lookup."""
+
+    def __getitem__(self, widget_type: str) -> type[BaseWidget]:
+        module_name, _, class_name = WIDGET_MODULES[widget_type].partition(":")
+        return getattr(importlib.import_module(module_name), class_name)
+
+    def __contains__(self, widget_type: object) -> bool:
+        return widget_type in WIDGET_MODULES
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(WIDGET_MODULES)
+
+    def __len__(self) -> int:
+        return len(WIDGET_MODULES)
+
+
+WIDGET_REGISTRY: Mapping[str, type[BaseWidget]] = _WidgetRegistry()
+
+
 def detect_terminal_width() -> int:
     """Detect terminal width, fallback to 80."""
-    try:
-        return os.get_terminal_size().columns
-    except OSError:
-        return 80
+    return detect_capabilities().width
 
 
 def _strip_ansi(text: str) -> str:
@@ -55,8 +72,26 @@ def _visible_len(text: str) -> int:
     return len(_strip_ansi(text))
 
 
-def _render_widget(widget_config: dict, width: int) -> list[str] | None:
-    """Render a single widget, returning its lines or None on failure."""
+def _cache_settings(widget_config: dict, widget: BaseWidget) -> tuple[float, list[str]]:
+    """A widget's cache TTL and dependencies after config overrides.
+
+    An explicit ``"cache_ttl": 0`` disables caching altogether, declared
+    dependencies included.
+    """
+    ttl = widget_config.get("cache_ttl", widget.cache_ttl)
+    if "cache_ttl" in widget_config and ttl <= 0:
+        return 0, []
+    return ttl, widget_config.get("dependencies", widget.dependencies())
+
+
+def _render_widget(widget_config: dict, width: int, pool: WidgetPool | None = None,
+                   policy: LoadPolicy | None = None,
+                   widget: BaseWidget | None = None) -> list[str] | None:
+    """Render a single widget, returning its lines or None on failure.
+
+    ``widget`` is an already constructed instance to reuse; by default a
+    new one is built from the config.
+    """
     widget_type = widget_config["type"]
     enabled = widget_config.get("enabled", True)
 
@@ -68,23 +103,59 @@ def _render_widget(widget_config: dict, width: int) -> list[str] | None:
     if widget_class is None:
         return [f"[unknown widget: {widget_type}]"]
 
+    key = cache_key(widget_config, width if widget_class.width_dependent else None,
+                    os.geteuid() if widget_class.per_user else None)
+
+    if policy is not None and policy.should_degrade(widget_config, widget_class):
+        cached = load_cached(key)
+        policy.record(widget_type, "cache" if cached else "skip")
+        return cached["lines"] if cached else None
+
+    if pool is not None and widget_config.get("isolate", False):
+        return pool.result(id(widget_config))
+
     try:
-        widget = widget_class(widget_config, width=width)
+        if widget is None:
+            widget = widget_class(widget_config, width=width)
+        ttl, dependencies = _cache_settings(widget_config, widget)
+        if ttl > 0 or dependencies:
+            wait = widget_config.get("single_flight_wait", 2.0)
+            failure_ttl = widget_config.get("failure_ttl", FAILURE_TTL)
+            return render_single_flight(key, widget.render, ttl, wait, dependencies, failure_ttl)
         return widget.render()
     except Exception as e:
         return [f"[{widget_type} error: {e}]"]
 
 
-def _render_row(widgets_in_row: list[dict], width: int, gap: int = 4) -> str:
-    """Render multiple widgets side by side, packed by content width."""
-    # Render each widget
-    columns: list[list[str]] = []
-    for widget_config in widgets_in_row:
-        lines = _render_widget(widget_config, width)
-        if lines is None:
-            lines = []
-        columns.append(lines)
+def _start_isolated(widgets: list[dict], width: int, settings: dict,
+                    policy: LoadPolicy | None = None) -> WidgetPool | None:
+    """Submit every enabled widget marked ``isolate`` to a worker pool.
+
+    Jobs start immediately, so isolated widgets run in parallel with each
+    other and with the in-process widgets rendered afterwards.
+    """
+    isolated = [
+        w for w in widgets
+        if w.get("isolate", False) and w.get("enabled", True) and w["type"] in WIDGET_REGISTRY
+        and not (policy is not None and policy.should_degrade(w, WIDGET_REGISTRY[w["type"]]))
+    ]
+    if not isolated:
+        return None
 
+    pool = WidgetPool(
+        pool_size(len(isolated), settings),
+        start_method=settings.get("isolate_start_method"),
+        preload=sorted({WIDGET_MODULES[w["type"]].partition(":")[0] for w in isolated}),
+    )
+    default_timeout = settings.get("isolate_timeout", DEFAULT_TIMEOUT)
+    for widget_config in isolated:
+        timeout = widget_config.get("isolate_timeout", default_timeout)
+        pool.submit(id(widget_config), widget_config, width, timeout)
+    return pool
+
+
+def _merge_columns(columns: list[list[str]], gap: int = 4) -> str:
+    """Lay rendered widgets out side by side, packed by content width."""
     if not columns:
         return ""
 
@@ -96,9 +167,7 @@ def _render_row(widgets_in_row: list[dict], width: int, gap: int = 4) -> str:
 
     # Pad all columns to the same height
     max_height = max(len(col) for col in columns)
-    for col in columns:
-        while len(col) < max_height:
-            col.append("")
+    columns = [col + [""] * (max_height - len(col)) for col in columns]
 
     # Merge columns side by side
     merged_lines = []
@@ -116,22 +185,15 @@ def _render_row(widgets_in_row: list[dict], width: int, gap: int = 4) -> str:
     return "\n".join(merged_lines)
 
 
-def build_motd(config_path: str) -> str:
-    """Load config, run each enabled widget, and assemble the MOTD.
+def _compile_layout(widgets: list[dict], default_spacing: int) -> list[tuple[bool, list[dict], int]]:
+    """Group enabled widgets into blocks, in config order.
 
-    Args:
-        config_path: Path to the JSON config file.
+    Consecutive widgets sharing a ``row`` form one side-by-side block.
 
     Returns:
-        The fully assembled MOTD as a single string.
+        (is_row, widget_configs, space_after) for each block.
     """
-    config = load_config(config_path)
-    settings = config.get("settings", {})
-    default_spacing = settings.get("spacing", 1)
-    width = settings.get("width", detect_terminal_width())
-
-    widget_blocks: list[str] = []
-    widgets = config["widgets"]
+    blocks: list[tuple[bool, list[dict], int]] = []
     i = 0
 
     while i < len(widgets):
@@ -151,27 +213,256 @@ def build_motd(config_path: str) -> str:
                 if widgets[j].get("row") == row and widgets[j].get("enabled", True):
                     row_widgets.append(widgets[j])
                     j += 1
-                elif widgets[j].get("row") is not None and widgets[j].get("row") != row:
-                    break
                 else:
                     break
 
-            block = _render_row(row_widgets, width)
-
             # Use spaceAfter from the last widget in the row
             space_after = row_widgets[-1].get("spaceAfter", default_spacing)
-            block += "\n" * space_after
-
-            widget_blocks.append(block)
+            blocks.append((True, row_widgets, space_after))
             i = j
         else:
             # Single full-width widget
-            lines = _render_widget(widget_config, width)
-            if lines is not None:
-                block = "\n".join(lines)
-                space_after = widget_config.get("spaceAfter", default_spacing)
-                block += "\n" * space_after
-                widget_blocks.append(block)
+            space_after = widget_config.get("spaceAfter", default_spacing)
+            blocks.append((False, [widget_config], space_after))
             i += 1
 
-    return "\n".join(widget_blocks)
\ No newline at end of file
+    return blocks
+
+
+def _assemble(layout: list[tuple[bool, list[dict], int]],
+              render: Callable[[dict], list[str] | None]) -> list[str]:
+    """Render a compiled layout into text blocks with ``render`` per widget."""
+    widget_blocks: list[str] = []
+    for is_row, widget_configs, space_after in layout:
+        if is_row:
+            block = _merge_columns([render(w) or [] for w in widget_configs])
+        else:
+            lines = render(widget_configs[0])
+            if lines is None:
+                continue
+            block = "\n".join(lines)
+        widget_blocks.append(block + "\n" * space_after)
+    return widget_blocks
+
+
+def _width_dependent(widget_config: dict) -> bool:
+    widget_class = WIDGET_REGISTRY.get(widget_config["type"])
+    return widget_class is not None and widget_class.width_dependent
+
+
+def _build_variants(config: dict, widths: list[int], isolate: bool) -> dict[int, str]:
+    """Collect every widget once and lay the results out at each width.
+
+    Only width-dependent widgets (separators, which collect nothing)
+    render again per width; rows are packed by content, not width.
+    """
+    settings = config.get("settings", {})
+    widest = max(widths)
+
+    # Load static host facts once, before any widget asks for them
+    get_facts()
+
+    widgets = config["widgets"]
+    layout = _compile_layout(widgets, settings.get("spacing", 1))
+    # Check host pressure once, before any expensive widget starts
+    policy = LoadPolicy(settings)
+    pool = _start_isolated(widgets, widest, settings, policy) if isolate else None
+
+    try:
+        collected: dict[int, list[str] | None] = {}
+        for _, widget_configs, _ in layout:
+            for widget_config in widget_configs:
+                if not _width_dependent(widget_config):
+                    collected[id(widget_config)] = _render_widget(widget_config, widest, pool, policy)
+
+        def render(widget_config: dict, width: int) -> list[str] | None:
+            if id(widget_config) in collected:
+                return collected[id(widget_config)]
+            return _render_widget(widget_config, width, policy=policy)
+
+        return {width: "\n".join(_assemble(layout, lambda w: render(w, width))) for width in widths}
+    finally:
+        if pool is not None:
+            pool.close()
+        policy.save()
+
+
+def build_motd(config_path: str, isolate: bool = True) -> str:
+    """Load config, run each enabled widget, and assemble the MOTD.
+
+    Args:
+        config_path: Path to the JSON config file.
+        isolate: Whether widgets marked ``isolate`` run in worker
+            processes; False renders everything in-process.
+
+    Returns:
+        The fully assembled MOTD as a single string.
+    """
+    config = load_config(config_path)
+    width = config.get("settings", {}).get("width", detect_terminal_width())
+    return _build_variants(config, [width], isolate)[width]
+
+
+def build_variants(config_path: str, widths: list[int], isolate: bool = True) -> dict[int, str]:
+    """Render the MOTD at several widths from a single collection pass.
+
+    Args:
+        config_path: Path to the JSON config file.
+        widths: Terminal widths to lay the output out for.
+        isolate: As for build_motd().
+
+    Returns:
+        {width: assembled MOTD} for each requested width.
+    """
+    return _build_variants(load_config(config_path), sorted(set(widths)), isolate)
+
+
+class MotdEngine:
+    """Renders the MOTD repeatedly in one process, keeping state warm.
+
+    Built once from a config, it keeps the widget instances, a shared
+    HTTP session, the compiled layout and each widget's last result.
+    A result is reused while the widget's declared dependencies are
+    unchanged (watched with inotify) or its ``cache_ttl`` has not passed,
+    so a render only recomputes what may have changed. Widgets always
+    render in-process, and every public method is safe to call from
+    multiple threads.
+
+    Args:
+        config_path: Path to the JSON config file.
+        width: Layout width; defaults to the ``width`` setting or the
+            detected terminal width.
+    """
+
+    def __init__(self, config_path: str, width: int | None = None) -> None:
+        # Imported here so the one-shot login path doesn't pay for it
+        import requests
+
+        self.config_path = str(config_path)
+        self.session = requests.Session()
+        self._width = width
+        self._lock = threading.RLock()
+        use_inotify()
+        self._load()
+
+    def _load(self) -> None:
+        """(Re)build config, widget instances and layout from the config file."""
+        config = load_config(self.config_path)
+        self._config_token = dependency_token([self.config_path])
+        self.settings: dict[str, Any] = config.get("settings", {})
+        self.width = self._width or self.settings.get("width", detect_terminal_width())
+
+        self._widgets: list[dict] = config["widgets"]
+        self._layout = _compile_layout(self._widgets, self.settings.get("spacing", 1))
+        self._instances: dict[int, BaseWidget] = {}
+        for widget_config in self._widgets:
+            widget_class = WIDGET_REGISTRY.get(widget_config["type"])
+            if widget_class is not None and widget_config.get("enabled", True):
+                widget = widget_class(widget_config, width=self.width)
+                widget.session = self.session
+                self._instances[id(widget_config)] = widget
+
+        # id(widget_config) -> (dependency token, expiry, lines)
+        self._results: dict[int, tuple[str | None, float, list[str] | None]] = {}
+        get_facts()
+
+    def render(self) -> str:
+        """Render the full MOTD."""
+        with self._lock:
+            policy = LoadPolicy(self.settings)
+            try:
+                blocks = _assemble(self._layout, lambda w: self._widget_lines(w, policy))
+            finally:
+                policy.save()
+            return "\n".join(blocks)
+
+    def render_widget(self, name: str) -> list[str]:
+        """Render one widget, matched by its ``name`` or ``type`` config key.
+
+        Raises:
+            KeyError: If no enabled widget matches.
+        """
+        with self._lock:
+            widget_config = self._find(name)
+            policy = LoadPolicy(self.settings)
+            try:
+                return self._widget_lines(widget_config, policy) or []
+            finally:
+                policy.save()
+
+    def render_variants(self, widths: list[int]) -> dict[int, str]:
+        """Render the full MOTD at several widths, collecting each widget once."""
+        with self._lock:
+            policy = LoadPolicy(self.settings)
+            collected: dict[int, list[str] | None] = {}
+
+            def render(widget_config: dict, width: int) -> list[str] | None:
+                if _width_dependent(widget_config):
+                    return _render_widget(widget_config, width, policy=policy)
+                if id(widget_config) not in collected:
+                    collected[id(widget_config)] = self._widget_lines(widget_config, policy)
+                return collected[id(widget_config)]
+
+            try:
+                return {width: "\n".join(_assemble(self._layout, lambda w: render(w, width)))
+                        for width in widths}
+            finally:
+                policy.save()
+
+    def refresh(self, name: str | None = None) -> None:
+        """Forget remembered results so the next render recomputes them.
+
+        With ``name``, only that widget is refreshed. Otherwise the config
+        is also re-read if its file changed. Entries in the shared
+        on-disk cache still apply until they expire.
+
+        Raises:
+            KeyError: If ``name`` matches no enabled widget.
+        """
+        with self._lock:
+            if name is not None:
+                self._results.pop(id(self._find(name)), None)
+            elif dependency_token([self.config_path]) != self._config_token:
+                self._load()
+            else:
+                self._results.clear()
+
+    def close(self) -> None:
+        """Close the shared HTTP session."""
+        self.session.close()
+
+    def _find(self, name: str) -> dict:
+        for widget_config in self._widgets:
+            if widget_config.get("enabled", True) and name in (widget_config.get("name"),
+                                                               widget_config["type"]):
+                return widget_config
+        raise KeyError(f"No enabled widget named {name!r}")
+
+    def _widget_lines(self, widget_config: dict, policy: LoadPolicy) -> list[str] | None:
+        """A widget's lines, reusing the remembered result while still valid."""
+        key = id(widget_config)
+        widget = self._instances.get(key)
+        if widget is None or policy.should_degrade(widget_config, type(widget)):
+            return _render_widget(widget_config, self.width, policy=policy)
+
+        ttl, dependencies = _cache_settings(widget_config, widget)
+        if ttl <= 0 and not dependencies:
+            return _render_widget(widget_config, self.width, policy=policy, widget=widget)
+        token = dependency_token(dependencies) if dependencies else None
+
+        remembered = self._results.get(key)
+        if remembered is not None:
+            old_token, expires, lines = remembered
+            if old_token is not None and old_token == token:
+                return lines
+            if old_token is None and time.monotonic() < expires:
+                return lines
+
+        lines = _render_widget(widget_config, self.width, policy=policy, widget=widget)
+        if isinstance(lines, RenderFailure):
+            # Retried after failure_ttl whatever the dependencies do
+            failure_ttl = widget_config.get("failure_ttl", FAILURE_TTL)
+            self._results[key] = (None, time.monotonic() + failure_ttl, lines)
+        elif token is not None or ttl > 0:
+            self._results[key] = (token, time.monotonic() + ttl, lines)
+        return lines
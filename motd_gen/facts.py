@@ -0,0 +1,87 @@
+"""Boot-scoped cache of static host facts (OS release, CPU count, memory).
+
+Facts that come from uname() (hostname, kernel, machine) cost a single
+syscall and can change at any time (hostname, DHCP), so they are read
+live on every call rather than cached.
+"""
+
+import os
+from typing import Any
+from motd_gen.cache import load_json, read_boot_id, save_json
+
+CACHE_NAME = "facts.json"
+
+# Files whose contents the facts are derived from; a change to any of
+# them (package upgrade) invalidates the cache. The first one that
+# exists is used, as the os-release spec prescribes.
+SOURCE_FILES = ["/etc/os-release", "/usr/lib/os-release"]
+
+_facts: dict[str, Any] | None = None
+
+
+def parse_os_release(path: str = "/etc/os-release") -> dict[str, str]:
+    """Parse an os-release file into a dictionary."""
+    data = {}
+
+    if not os.path.exists(path):
+        return data
+
+    with open(path, "r") as f:
+        for line in f.read().strip().split("\n"):
+            if "=" in line:
+                key, value = line.split("=", 1)
+                data[key] = value.strip('"')
+
+    return data
+
+
+def _fingerprint() -> list:
+    """Boot id plus (mtime, size, inode) of every source file."""
+    parts: list = [read_boot_id()]
+    for path in SOURCE_FILES:
+        try:
+            st = os.stat(path)
+            parts.append([path, st.st_mtime_ns, st.st_size, st.st_ino])
+        except OSError:
+            parts.append([path, None])
+    return parts
+
+
+def _collect() -> dict[str, Any]:
+    """Compute the cached facts from scratch."""
+    os_release: dict[str, str] = {}
+    for path in SOURCE_FILES:
+        if os.path.exists(path):
+            os_release = parse_os_release(path)
+            break
+    return {
+        "os_release": os_release,
+        "cpu_count": os.cpu_count() or 1,
+        "mem_total": os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES"),
+    }
+
+
+def _live() -> dict[str, Any]:
+    """Facts read fresh on every call, all from one uname()."""
+    uname = os.uname()
+    return {"hostname": uname.nodename, "kernel": uname.release, "machine": uname.machine}
+
+
+def get_facts() -> dict[str, Any]:
+    """Return host facts, the static ones recomputed only after a reboot or source change.
+
+    The first call per process reads the cached facts file once and
+    validates it against the boot id and source file stats; later calls
+    reuse the in-memory copy. hostname, kernel and machine are always
+    current.
+    """
+    global _facts
+    if _facts is None:
+        fingerprint = _fingerprint()
+        cached = load_json(CACHE_NAME)
+        if isinstance(cached, dict) and cached.get("fingerprint") == fingerprint:
+            _facts = cached["facts"]
+        else:
+            _facts = _collect()
+            save_json(CACHE_NAME, {"fingerprint": fingerprint, "facts": _facts})
+    return {**_facts, **_live()}
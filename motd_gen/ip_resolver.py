@@ -0,0 +1,206 @@
+"""Public IP resolution racing several providers, happy-eyeballs style."""
+
+import hashlib
+import ipaddress
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any
+import psutil
+from motd_gen.cache import load_json, save_json
+
+PUBLIC_IP_URL = "https://api.ipify.org"
+METADATA_URL = "http://169.254.169.254/latest/meta-data/public-ipv4"
+
+DEFAULT_PROVIDERS: list[dict[str, Any]] = [
+    {"type": "http", "url": PUBLIC_IP_URL},
+    {"type": "http", "url": "https://ipv4.icanhazip.com"},
+    {"type": "http", "url": "https://checkip.amazonaws.com"},
+]
+
+# Providers that answer from the host or the local network start at once;
+# remote echo services start one ``stagger`` apart, or as soon as another
+# provider fails, and only if nothing has answered yet.
+LOCAL_TYPES = ("file", "metadata", "cache_server")
+
+CACHE_NAME = "public-ip.json"
+
+
+def network_fingerprint(proc_root: str = "/proc") -> str:
+    """Hash of local interface addresses and default routes.
+
+    The public address rarely changes unless one of these does, so a
+    resolved IP stays valid while the fingerprint matches.
+    """
+    parts = []
+    for iface, addrs in sorted(psutil.net_if_addrs().items()):
+        for addr in addrs:
+            if addr.family.name in ("AF_INET", "AF_INET6"):
+                parts.append(f"{iface}={addr.address}")
+
+    for name, is_default in (("route", lambda f: len(f) > 2 and f[1] == "00000000"),
+                             ("ipv6_route", lambda f: len(f) > 1 and f[0] == "0" * 32 and f[1] == "00")):
+        try:
+            with open(f"{proc_root}/net/{name}", "r") as f:
+                for line in f:
+                    fields = line.split()
+                    if is_default(fields):
+                        parts.append(f"{name}:{' '.join(fields)}")
+        except OSError:
+            pass
+
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+
+def _validate(text: str) -> str:
+    """Return the address if ``text`` is a globally routable IP, else raise ValueError.
+
+    Private (RFC 1918, ULA), CGNAT, loopback, link-local and documentation
+    addresses are what a misbehaving provider or proxy returns, never the
+    public address.
+    """
+    address = ipaddress.ip_address(text.strip())
+    if not address.is_global:
+        raise ValueError(f"not a public address: {address}")
+    return str(address)
+
+
+class PublicIPResolver:
+    """Resolves the public IP from the first provider with a valid answer.
+
+    Config keys (from the widget config): ``providers`` (list of
+    {"type": "file"|"metadata"|"cache_server"|"http", ...}), ``stagger``
+    (seconds between remote provider starts, default 0.25), ``max_age``
+    (seconds a cached answer is trusted, default 86400), and
+    ``cache_server`` which adds a cache_server provider.
+
+    Providers race on separate threads, so HTTP providers make one-off
+    requests rather than share a requests.Session, which is not
+    thread-safe.
+    """
+
+    def __init__(self, config: dict[str, Any]) -> None:
+        providers = list(config.get("providers", DEFAULT_PROVIDERS))
+        cache_server = config.get("cache_server")
+        if cache_server and not any(p.get("type") == "cache_server" for p in providers):
+            providers.insert(0, {"type": "cache_server", "server": cache_server,
+                                 "timeout": config.get("cache_server_timeout", 0.5)})
+        self.providers = providers
+        self.stagger = config.get("stagger", 0.25)
+        self.max_age = config.get("max_age", 86400)
+        self.proc_root = config.get("proc_root", "/proc")
+
+    def cached(self) -> str | None:
+        """Return the cached IP if the network looks unchanged."""
+        entry = load_json(CACHE_NAME)
+        if not isinstance(entry, dict) or time.time() - entry.get("time", 0) > self.max_age:
+            return None
+        if entry.get("fingerprint") != network_fingerprint(self.proc_root):
+            return None
+        try:
+            # Entries written before non-global addresses were rejected
+            return _validate(entry.get("ip") or "")
+        except ValueError:
+            return None
+
+    def resolve(self, timeout: float) -> str:
+        """Race all providers and return the first valid address.
+
+        Local providers start at once, remote ones one at a time: the
+        next starts ``stagger`` after the previous one, or as soon as any
+        provider fails.
+
+        Raises:
+            requests.Timeout: If nothing answered within ``timeout``.
+            Exception: The first provider error, if every provider failed.
+        """
+        results: queue.Queue = queue.Queue()
+        deadline = time.monotonic() + timeout
+        local = [p for p in self.providers if p.get("type") in LOCAL_TYPES]
+        remote = deque(p for p in self.providers if p.get("type") not in LOCAL_TYPES)
+
+        for provider in local:
+            self._start(provider, deadline, results)
+        running = len(local)
+        next_start = time.monotonic()
+
+        errors: list[Exception] = []
+        while True:
+            now = time.monotonic()
+            if now >= deadline or not (running or remote):
+                break
+            if remote and now >= next_start:
+                self._start(remote.popleft(), deadline, results)
+                running += 1
+                next_start = now + self.stagger
+                continue
+            wait = deadline - now
+            if remote:
+                wait = min(wait, next_start - now)
+            try:
+                provider, address, error = results.get(timeout=wait)
+            except queue.Empty:
+                continue
+            running -= 1
+            if error is not None:
+                errors.append(error)
+                # Nothing to wait for: the next provider starts now
+                next_start = time.monotonic()
+                continue
+            save_json(CACHE_NAME, {
+                "ip": address,
+                "provider": provider.get("url") or provider.get("path") or provider.get("type"),
+                "fingerprint": network_fingerprint(self.proc_root),
+                "time": time.time(),
+            })
+            return address
+
+        if errors and len(errors) == len(self.providers):
+            raise errors[0]
+        import requests
+
+        raise requests.Timeout(f"no public IP provider answered within {timeout:g}s")
+
+    def _start(self, provider: dict, deadline: float, results: queue.Queue) -> None:
+        """Query one provider on its own thread, reporting to ``results``."""
+        threading.Thread(target=self._run_provider, args=(provider, deadline, results),
+                         daemon=True).start()
+
+    def _run_provider(self, provider: dict, deadline: float, results: queue.Queue) -> None:
+        """Query one provider and report its address or error."""
+        try:
+            address = _validate(self._query(provider, max(0.0, deadline - time.monotonic())))
+            results.put((provider, address, None))
+        except Exception as e:
+            results.put((provider, None, e))
+
+    def _query(self, provider: dict, remaining: float) -> str:
+        """Fetch the raw answer from one provider."""
+        kind = provider.get("type", "http")
+        timeout = min(remaining, provider.get("timeout", remaining))
+
+        if kind == "file":
+            with open(provider["path"], "r") as f:
+                return f.read()
+
+        if kind == "cache_server":
+            from motd_gen import cache_client
+
+            return cache_client.fetch(provider["server"], "/public-ip", timeout=timeout).decode()
+
+        if kind == "metadata":
+            url = provider.get("url", METADATA_URL)
+            # Link-local metadata answers in milliseconds or not at all
+            timeout = min(timeout, provider.get("timeout", 0.3))
+        elif kind == "http":
+            url = provider["url"]
+        else:
+            raise ValueError(f"unknown provider type: {kind}")
+
+        # Imported here so cached() stays free of requests
+        import requests
+
+        response = requests.get(url, headers=provider.get("headers"), timeout=timeout)
+        response.raise_for_status()
+        return response.text
@@ -0,0 +1,151 @@
+"""Process-isolated widget execution with hard deadlines."""
+
+import marshal
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import Connection, wait
+from typing import Any
+
+DEFAULT_TIMEOUT = 10.0
+
+
+def _worker_main(conn: Connection) -> None:
+    """Worker loop: render widget jobs received over the pipe until EOF."""
+    from motd_gen.engine import _render_widget
+
+    while True:
+        try:
+            widget_config, width = marshal.loads(conn.recv_bytes())
+        except (EOFError, OSError):
+            return
+        lines = _render_widget(widget_config, width)
+        # marshal only takes exact builtin types, not RenderFailure
+        conn.send_bytes(marshal.dumps(list(lines) if lines is not None else None))
+
+
+class _Worker:
+    """One worker process and the parent's end of its pipe."""
+
+    def __init__(self, ctx: Any) -> None:
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.job: Any = None
+        self.deadline = 0.0
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class WidgetPool:
+    """A reusable pool of worker processes that render widgets.
+
+    Workers are started once and reused for every isolated widget in a
+    run. Jobs are serialized with marshal over a pipe. A job that misses
+    its deadline has its worker killed with SIGKILL and gets placeholder
+    output; a replacement worker is started only if more jobs are queued.
+    """
+
+    def __init__(self, size: int, start_method: str | None = None,
+                 preload: list[str] | None = None) -> None:
+        """Start ``size`` workers with the given multiprocessing start method.
+
+        ``preload`` lists the modules a forkserver imports once before
+        forking workers, normally the widget modules they will render.
+        """
+        if start_method is None:
+            methods = multiprocessing.get_all_start_methods()
+            start_method = "forkserver" if "forkserver" in methods else "spawn"
+
+        self._ctx = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            # Import the widgets once in the server; each fork is then cheap
+            self._ctx.set_forkserver_preload(["motd_gen.engine", *(preload or [])])
+
+        self._size = max(1, size)
+        self._workers = [_Worker(self._ctx) for _ in range(self._size)]
+        self._queue: deque = deque()
+        self._results: dict[Any, list[str]] = {}
+        self._pending: set = set()
+
+    def submit(self, key: Any, widget_config: dict, width: int, timeout: float) -> None:
+        """Queue a widget for rendering; the deadline starts on dispatch."""
+        self._pending.add(key)
+        self._queue.append((key, widget_config, width, timeout))
+        self._dispatch()
+
+    def result(self, key: Any) -> list[str]:
+        """Block until the job for ``key`` has finished or been killed.
+
+        Raises:
+            KeyError: If no job was submitted under ``key``.
+        """
+        if key not in self._pending:
+            raise KeyError(key)
+        while key not in self._results:
+            self._poll()
+        self._pending.discard(key)
+        return self._results.pop(key)
+
+    def close(self) -> None:
+        """Stop all workers."""
+        for worker in self._workers:
+            worker.kill()
+        self._workers = []
+
+    def _dispatch(self) -> None:
+        """Hand queued jobs to idle workers, replacing killed ones."""
+        while self._queue:
+            idle = [w for w in self._workers if w.job is None]
+            if not idle and len(self._workers) < self._size:
+                idle = [_Worker(self._ctx)]
+                self._workers.append(idle[0])
+            if not idle:
+                return
+
+            worker = idle[0]
+            key, widget_config, width, timeout = self._queue.popleft()
+            worker.job = (key, widget_config.get("type", "?"), timeout)
+            worker.deadline = time.monotonic() + timeout
+            worker.conn.send_bytes(marshal.dumps((widget_config, width)))
+
+    def _poll(self) -> None:
+        """Wait for the next result or deadline and process it."""
+        busy = [w for w in self._workers if w.job is not None]
+        if not busy:
+            self._dispatch()
+            return
+
+        nearest = min(w.deadline for w in busy)
+        ready = wait([w.conn for w in busy], timeout=max(0.0, nearest - time.monotonic()))
+        now = time.monotonic()
+
+        for worker in busy:
+            key, widget_type, timeout = worker.job
+            if worker.conn in ready:
+                try:
+                    self._results[key] = marshal.loads(worker.conn.recv_bytes())
+                    worker.job = None
+                    continue
+                except (EOFError, OSError, ValueError):
+                    self._results[key] = [f"[{widget_type} worker crashed]"]
+            elif worker.deadline <= now:
+                self._results[key] = [f"[{widget_type} timed out after {timeout:g}s]"]
+            else:
+                continue
+
+            worker.kill()
+            self._workers.remove(worker)
+
+        self._dispatch()
+
+
+def pool_size(isolated_count: int, settings: dict[str, Any]) -> int:
+    """Number of workers for a run: one per isolated widget, capped by CPUs."""
+    limit = settings.get("isolate_workers", os.cpu_count() or 1)
+    return max(1, min(isolated_count, limit))
@@ -0,0 +1,128 @@
+"""Load-aware degradation of low-priority, expensive widgets."""
+
+import json
+import os
+import time
+from typing import Any
+from motd_gen.cache import cache_dir
+
+PRIORITIES = {"low": 0, "normal": 1, "high": 2}
+COSTS = {"cheap": 0, "moderate": 1, "expensive": 2}
+
+DEFAULT_THRESHOLDS = {
+    # 1-minute load average divided by CPU count
+    "load_per_cpu": 2.0,
+    # PSI "some" avg10 percentages
+    "cpu_pressure": 60.0,
+    "memory_pressure": 20.0,
+    "io_pressure": 40.0,
+}
+
+LOG_NAME = "degradation.log"
+LOG_MAX_BYTES = 256 * 1024
+
+NORMAL, HIGH, CRITICAL = 0, 1, 2
+LEVEL_NAMES = ["normal", "high", "critical"]
+
+
+def read_pressure(proc_root: str = "/proc") -> dict[str, float]:
+    """Read load average per CPU and PSI avg10 values.
+
+    Missing sources (e.g. kernels without PSI) are simply left out.
+    """
+    readings: dict[str, float] = {}
+
+    try:
+        with open(f"{proc_root}/loadavg", "r") as f:
+            load1 = float(f.read().split()[0])
+        readings["load_per_cpu"] = load1 / (os.cpu_count() or 1)
+    except (OSError, ValueError, IndexError):
+        pass
+
+    for resource in ("cpu", "memory", "io"):
+        try:
+            with open(f"{proc_root}/pressure/{resource}", "r") as f:
+                some = f.readline().split()
+            avg10 = dict(field.split("=", 1) for field in some[1:])["avg10"]
+            readings[f"{resource}_pressure"] = float(avg10)
+        except (OSError, ValueError, KeyError, IndexError):
+            pass
+
+    return readings
+
+
+class LoadPolicy:
+    """Decides which widgets to degrade given current host pressure.
+
+    The level is "high" when any reading passes its threshold and
+    "critical" past twice the threshold. At "high", low-priority expensive
+    widgets are degraded; at "critical", every widget that is not cheap
+    or high priority is. A degraded widget shows its last cached output,
+    or is skipped when nothing is cached.
+    """
+
+    def __init__(self, settings: dict[str, Any], readings: dict[str, float] | None = None) -> None:
+        """Build the policy from the ``load_policy`` settings section."""
+        options = settings.get("load_policy", {})
+        self.enabled = options.get("enabled", True)
+        self.thresholds = {**DEFAULT_THRESHOLDS, **options.get("thresholds", {})}
+
+        if not self.enabled:
+            self.readings: dict[str, float] = {}
+        elif readings is not None:
+            self.readings = readings
+        else:
+            self.readings = read_pressure(options.get("proc_root", "/proc"))
+
+        self.level = self._level()
+        self.degraded: list[dict[str, str]] = []
+
+    def _level(self) -> int:
+        level = NORMAL
+        for name, value in self.readings.items():
+            threshold = self.thresholds.get(name)
+            if threshold is None:
+                continue
+            if value >= threshold * 2:
+                return CRITICAL
+            if value >= threshold:
+                level = HIGH
+        return level
+
+    def should_degrade(self, widget_config: dict, widget_class: type) -> bool:
+        """Whether a widget should be served from cache or skipped."""
+        if self.level == NORMAL:
+            return False
+
+        priority = PRIORITIES.get(widget_config.get("priority", widget_class.priority), 1)
+        cost = COSTS.get(widget_config.get("cost", widget_class.cost_for(widget_config)), 0)
+
+        if self.level == HIGH:
+            return priority == PRIORITIES["low"] and cost == COSTS["expensive"]
+        return priority < PRIORITIES["high"] and cost > COSTS["cheap"]
+
+    def record(self, widget_type: str, action: str) -> None:
+        """Note that a widget was degraded ("cache" or "skip")."""
+        self.degraded.append({"widget": widget_type, "action": action})
+
+    def save(self) -> None:
+        """Append this run's decisions to the degradation log, if any."""
+        if not self.degraded:
+            return
+
+        entry = {
+            "time": time.time(),
+            "level": LEVEL_NAMES[self.level],
+            "readings": self.readings,
+            "thresholds": self.thresholds,
+            "degraded": self.degraded,
+        }
+        path = cache_dir() / LOG_NAME
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.exists() and path.stat().st_size > LOG_MAX_BYTES:
+                os.replace(path, path.with_name(LOG_NAME + ".1"))
+            with open(path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError:
+            pass
@@ -0,0 +1,316 @@
+"""Login-storm load generator for ``motd-gen loadtest``.
+
+Renders the MOTD for many simulated sessions at once, either as separate
+``motd-gen`` processes or as concurrent in-process build_motd calls, and
+reports latency percentiles and what the storm cost the host.
+
+External dependencies are replaced so results are repeatable and only
+the injected latency varies: apt, journalctl and loginctl resolve to
+stub scripts placed first on PATH, and weather and public IP lookups go
+to a local stand-in HTTP server.
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+DEFAULT_CONFIG = Path(__file__).parent.parent / "config" / "motd.json"
+
+# Seconds each dependency takes to answer, overridable with --latency
+DEFAULT_LATENCY = {"http": 0.2, "apt": 0.5, "journalctl": 0.1, "loginctl": 0.02}
+
+# Canned output for each stubbed command, as a shell snippet
+STUB_COMMANDS = {
+    "apt": 'printf "Listing...\\nbash/stable 5.2 amd64\\ncurl/stable 8.5 amd64\\n"',
+    "journalctl": (
+        'printf "Oct 19 08:01:02 host systemd-logind[812]: New session 3 of user alice.\\n'
+        'Oct 19 09:15:40 host systemd-logind[812]: New session 7 of user bob.\\n"'
+    ),
+    "loginctl": (
+        'case "$1 $3" in\n'
+        '  "list-sessions "*) printf "3 1000 alice seat0 tty2\\n7 1001 bob - pts/0\\n" ;;\n'
+        '  *--property=Type) echo tty ;;\n'
+        '  *) printf "yes\\n198.51.100.7\\n" ;;\n'
+        'esac'
+    ),
+}
+
+# Must be globally routable: documentation ranges fail public IP validation
+STAND_IN_IP = b"93.184.216.34"
+STAND_IN_WEATHER = {
+    "current": {
+        "time": "2024-01-01T12:00", "temperature_2m": 68.0, "relative_humidity_2m": 40,
+        "apparent_temperature": 67.0, "weather_code": 1, "wind_speed_10m": 6.0,
+        "wind_direction_10m": 180, "pressure_msl": 1015.0, "uv_index": 3.0,
+        "cloud_cover": 10, "precipitation": 0.0,
+    },
+    "daily": {
+        "time": ["2024-01-01", "2024-01-02", "2024-01-03"],
+        "temperature_2m_max": [70.0, 72.0, 65.0], "temperature_2m_min": [50.0, 52.0, 48.0],
+        "precipitation_probability_max": [0, 10, 40],
+        "sunrise": ["2024-01-01T07:20"] * 3, "sunset": ["2024-01-01T17:40"] * 3,
+        "weather_code": [1, 2, 61],
+    },
+}
+
+# Widgets whose HTTP lookups are redirected to the stand-in server
+HTTP_WIDGETS = ("weather", "public_ip", "network")
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Answers weather and public IP requests after the injected delay."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        time.sleep(self.server.latency)  # type: ignore[attr-defined]
+        path = urlsplit(self.path).path
+        if path == "/weather":
+            body, content_type = json.dumps(STAND_IN_WEATHER).encode(), "application/json"
+        elif path == "/public-ip":
+            body, content_type = STAND_IN_IP, "text/plain"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def start_stand_in(latency: float) -> ThreadingHTTPServer:
+    """Serve the stand-in API on an ephemeral localhost port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+    server.daemon_threads = True
+    server.latency = latency  # type: ignore[attr-defined]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def write_stubs(directory: Path, latency: dict[str, float], log_path: Path) -> None:
+    """Create the stub commands; each invocation appends a line to ``log_path``."""
+    for command, output in STUB_COMMANDS.items():
+        path = directory / command
+        path.write_text(
+            "#!/bin/sh\n"
+            f"echo {command} >> '{log_path}'\n"
+            f"sleep {latency.get(command, 0)}\n"
+            f"{output}\n"
+        )
+        path.chmod(0o755)
+
+
+def stub_config(config_path: str, server_url: str) -> dict:
+    """Load the config with HTTP widgets pointed at the stand-in server."""
+    with open(config_path, "r") as f:
+        config = json.load(f)
+    for widget in config.get("widgets", []):
+        if widget.get("type") in HTTP_WIDGETS:
+            widget["cache_server"] = server_url
+            widget["cache_server_timeout"] = widget.get("timeout", 5)
+            widget["providers"] = []
+    return config
+
+
+def _host_clones() -> int | None:
+    """Host-wide count of clone() calls since boot, from /proc/stat."""
+    try:
+        with open("/proc/stat", "r") as f:
+            for line in f:
+                if line.startswith("processes "):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[int(rank) - 1]
+
+
+def _run_process(config_path: str, env: dict[str, str]) -> tuple[float, bool, int]:
+    """Run one ``motd-gen`` and return (seconds, ok, peak RSS in KiB)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "motd_gen", "--config", config_path],
+                            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL, env=env)
+    # wait4 rather than wait() to get this child's own peak RSS
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return time.perf_counter() - start, proc.returncode == 0, usage.ru_maxrss
+
+
+def _run_in_process(config_path: str) -> tuple[float, bool, int]:
+    """Run one in-process build_motd and return (seconds, ok, 0)."""
+    from motd_gen.engine import build_motd
+
+    start = time.perf_counter()
+    try:
+        # Threads share the process, so worker isolation is left out
+        build_motd(config_path, isolate=False)
+        ok = True
+    except Exception:
+        ok = False
+    return time.perf_counter() - start, ok, 0
+
+
+def run_storm(args: argparse.Namespace, latency: dict[str, float]) -> dict[str, Any]:
+    """Run the configured storm and return the measurements."""
+    workdir = Path(tempfile.mkdtemp(prefix="motd-gen-loadtest-"))
+    server = start_stand_in(latency.get("http", 0))
+    saved_env = dict(os.environ)
+    try:
+        bin_dir = workdir / "bin"
+        bin_dir.mkdir()
+        spawn_log = workdir / "spawns.log"
+        spawn_log.touch()
+        write_stubs(bin_dir, latency, spawn_log)
+
+        config_path = workdir / "motd.json"
+        config = stub_config(args.config, f"http://127.0.0.1:{server.server_address[1]}")
+        config_path.write_text(json.dumps(config))
+
+        package_root = str(Path(__file__).resolve().parent.parent)
+        os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"
+        os.environ["MOTD_GEN_CACHE_DIR"] = args.cache_dir or str(workdir / "cache")
+        os.environ["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [package_root, os.environ.get("PYTHONPATH")]))
+        env = dict(os.environ)
+
+        if args.in_process:
+            def run_one(_: int) -> tuple[float, bool, int]:
+                return _run_in_process(str(config_path))
+        else:
+            def run_one(_: int) -> tuple[float, bool, int]:
+                return _run_process(str(config_path), env)
+
+        self_before = resource.getrusage(resource.RUSAGE_SELF)
+        children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        clones_before = _host_clones()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency or args.sessions) as executor:
+            results = list(executor.map(run_one, range(args.sessions)))
+        wall = time.perf_counter() - started
+        clones_after = _host_clones()
+        self_after = resource.getrusage(resource.RUSAGE_SELF)
+        children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+        cpu = (children_after.ru_utime - children_before.ru_utime
+               + children_after.ru_stime - children_before.ru_stime)
+        if args.in_process:
+            cpu += (self_after.ru_utime - self_before.ru_utime
+                    + self_after.ru_stime - self_before.ru_stime)
+            peak_rss = self_after.ru_maxrss
+        else:
+            peak_rss = max(rss for _, _, rss in results)
+
+        commands: dict[str, int] = {}
+        for line in spawn_log.read_text().split():
+            commands[line] = commands.get(line, 0) + 1
+
+        latencies = sorted(seconds for seconds, _, _ in results)
+        return {
+            "mode": "in-process" if args.in_process else "process",
+            "sessions": args.sessions,
+            "concurrency": args.concurrency or args.sessions,
+            "latency_injected": latency,
+            "wall": wall,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else 0.0,
+            "failures": sum(1 for _, ok, _ in results if not ok),
+            "cpu_seconds": cpu,
+            "peak_rss_kib": peak_rss,
+            "motd_gen_processes": 0 if args.in_process else args.sessions,
+            "stub_invocations": commands,
+            "host_clones": (clones_after - clones_before
+                            if clones_before is not None and clones_after is not None else None),
+        }
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_env)
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def format_report(report: dict[str, Any]) -> str:
+    """Human-readable summary of run_storm() results."""
+    sessions = report["sessions"]
+    stubs = report["stub_invocations"]
+    rss_scope = "loadtest process" if report["mode"] == "in-process" else "largest invocation"
+    clones = report["host_clones"] if report["host_clones"] is not None else "n/a"
+    injected = ", ".join(f"{name} {seconds:g}s" for name, seconds in report["latency_injected"].items())
+    return "\n".join([
+        f"motd-gen loadtest: {sessions} sessions, concurrency {report['concurrency']}, "
+        f"{report['mode']} mode",
+        f"  injected  {injected}",
+        f"  latency   p50 {report['p50']:.3f}s  p95 {report['p95']:.3f}s  "
+        f"p99 {report['p99']:.3f}s  max {report['max']:.3f}s",
+        f"  wall      {report['wall']:.3f}s  failures {report['failures']}",
+        f"  cpu       {report['cpu_seconds']:.2f}s total, "
+        f"{report['cpu_seconds'] / max(sessions, 1):.3f}s per session",
+        f"  motd-gen  {report['motd_gen_processes']} processes",
+        f"  stubs     {sum(stubs.values())} invocations ("
+        + ", ".join(f"{name} {count}" for name, count in stubs.items()) + ")",
+        f"  clones    {clones} host-wide (every process and thread started during the storm, "
+        "including unstubbed commands and workers)",
+        f"  peak rss  {report['peak_rss_kib'] / 1024:.1f} MiB ({rss_scope})",
+    ])
+
+
+def _parse_latency(values: list[str]) -> dict[str, float]:
+    latency = dict(DEFAULT_LATENCY)
+    for value in values:
+        name, sep, seconds = value.partition("=")
+        if not sep or name not in DEFAULT_LATENCY:
+            raise argparse.ArgumentTypeError(
+                f"--latency expects NAME=SECONDS with NAME in {', '.join(DEFAULT_LATENCY)}")
+        latency[name] = float(seconds)
+    return latency
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run ``motd-gen loadtest``."""
+    parser = argparse.ArgumentParser(prog="motd-gen loadtest",
+                                     description="Simulate a login storm and report its cost.")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="path to motd.json")
+    parser.add_argument("-n", "--sessions", type=int, default=100, help="sessions to simulate")
+    parser.add_argument("-c", "--concurrency", type=int, default=0,
+                        help="sessions in flight at once (default: all)")
+    parser.add_argument("--in-process", action="store_true",
+                        help="call build_motd in threads instead of spawning motd-gen")
+    parser.add_argument("--latency", action="append", default=[], metavar="NAME=SECONDS",
+                        help=f"injected delay per dependency ({', '.join(DEFAULT_LATENCY)})")
+    parser.add_argument("--cache-dir", help="cache directory to use (default: a fresh, cold one)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        latency = _parse_latency(args.latency)
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        parser.error(str(e))
+
+    report = run_storm(args, latency)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
@@ -0,0 +1,107 @@
+"""Pre-rendered MOTD width variants (``motd-gen prerender``).
+
+One collection pass is laid out at several width breakpoints and stored
+in the shared cache. ``motd-gen --prerendered`` then prints the widest
+stored variant that fits the terminal without collecting anything,
+falling back to a normal render (which refreshes the variants) when none
+is usable.
+
+Run ``motd-gen prerender`` as root from a timer more often than
+``max_age`` and every user's login is served from its variants. Configs
+that enable per-user widgets (users, last_login) are stored per uid
+instead, since their output must not reach other users; those variants
+only serve the same user's later logins.
+"""
+
+import argparse
+import hashlib
+import os
+import time
+from pathlib import Path
+from motd_gen.cache import load_json, save_json
+from motd_gen.config import load_config
+from motd_gen.engine import WIDGET_REGISTRY, build_variants
+from motd_gen.watch import dependency_token
+
+DEFAULT_WIDTHS = [80, 120, 160, 240]
+DEFAULT_MAX_AGE = 300
+
+
+def _cache_name(config_path: str, uid: int | None = None) -> str:
+    digest = hashlib.sha1(os.path.realpath(config_path).encode()).hexdigest()[:12]
+    return f"variants-{digest}.json" if uid is None else f"variants-{digest}-{uid}.json"
+
+
+def _per_user(config_path: str) -> bool:
+    """Whether the config enables a widget whose output is per user."""
+    return any(w.get("enabled", True) and w["type"] in WIDGET_REGISTRY
+               and WIDGET_REGISTRY[w["type"]].per_user
+               for w in load_config(config_path)["widgets"])
+
+
+def prerender_settings(config_path: str) -> tuple[list[int], float]:
+    """Breakpoints and max age from the ``prerender`` settings section."""
+    options = load_config(config_path).get("settings", {}).get("prerender", {})
+    return options.get("widths", DEFAULT_WIDTHS), options.get("max_age", DEFAULT_MAX_AGE)
+
+
+def pick_width(widths: list[int], width: int) -> int:
+    """The widest breakpoint that fits ``width``, else the narrowest."""
+    fitting = [w for w in widths if w <= width]
+    return max(fitting) if fitting else min(widths)
+
+
+def prerender(config_path: str, widths: list[int], isolate: bool = True) -> dict[int, str]:
+    """Render and store every width variant.
+
+    Returns:
+        {width: assembled MOTD}.
+    """
+    variants = build_variants(config_path, widths, isolate)
+    uid = os.geteuid() if _per_user(config_path) else None
+    save_json(_cache_name(config_path, uid), {
+        "time": time.time(),
+        "config": dependency_token([config_path]),
+        "variants": {str(width): text for width, text in variants.items()},
+    }, shared=True)
+    return variants
+
+
+def load_variant(config_path: str, width: int, max_age: float) -> str | None:
+    """The stored variant for ``width``, or None if missing or stale.
+
+    Variants are stale once older than ``max_age`` seconds or when the
+    config file has changed since they were rendered. This user's own
+    variants are tried before the shared ones; either is only trusted
+    as load_json() trusts shared entries.
+    """
+    token = dependency_token([config_path])
+    for uid in (os.geteuid(), None):
+        entry = load_json(_cache_name(config_path, uid), shared=True)
+        if not isinstance(entry, dict) or not entry.get("variants"):
+            continue
+        if time.time() - entry.get("time", 0) > max_age or entry.get("config") != token:
+            continue
+        variants = {int(w): text for w, text in entry["variants"].items()}
+        return variants[pick_width(list(variants), width)]
+    return None
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run ``motd-gen prerender``."""
+    parser = argparse.ArgumentParser(prog="motd-gen prerender",
+                                     description="Store the MOTD at several terminal widths.")
+    parser.add_argument("--config", default=str(Path(__file__).parent.parent / "config" / "motd.json"),
+                        help="path to motd.json")
+    parser.add_argument("--widths", help="comma-separated breakpoints (default: from the config, "
+                                         f"else {','.join(map(str, DEFAULT_WIDTHS))})")
+    args = parser.parse_args(argv)
+
+    widths, _ = prerender_settings(args.config)
+    if args.widths:
+        widths = [int(w) for w in args.widths.split(",")]
+
+    start = time.perf_counter()
+    variants = prerender(args.config, widths)
+    print(f"Stored {len(variants)} variants ({', '.join(map(str, variants))}) "
+          f"in {time.perf_counter() - start:.3f}s")
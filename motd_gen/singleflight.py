@@ -0,0 +1,157 @@
+"""Cross-process single-flight rendering of cached widget output.
+
+When many logins arrive at once, only one process refreshes a given
+widget; the others wait briefly on its flock and reuse the result it
+writes, or fall back to the previous value if it takes too long.
+
+Entries and lock files live in the shared cache directory, readable by
+every user, so logins of different users coalesce too. Entries another
+user wrote are ignored (see shared_cache_dir()), and per-user widgets
+are keyed by uid.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable
+from motd_gen.cache import load_json, save_json, shared_cache_dir
+from motd_gen.watch import dependency_token
+from motd_gen.widgets.base import RenderFailure
+
+# How often a waiting process re-checks the lock
+POLL_INTERVAL = 0.02
+# Seconds a failed render is reused before the next login retries
+FAILURE_TTL = 15.0
+
+
+def cache_key(widget_config: dict, width: int | None = None, uid: int | None = None) -> str:
+    """Stable cache file stem for a widget config.
+
+    Pass ``width`` only for width-dependent widgets; every other widget
+    shares one entry across terminal widths and width variants. Pass
+    ``uid`` for per-user widgets so their output is never shared.
+    """
+    blob = json.dumps(widget_config, sort_keys=True, default=str)
+    if width is not None:
+        blob += f"|{width}"
+    if uid is not None:
+        blob += f"|uid={uid}"
+    digest = hashlib.sha1(blob.encode()).hexdigest()[:16]
+    return f"widget-{widget_config.get('type', 'unknown')}-{digest}"
+
+
+def load_cached(key: str) -> dict | None:
+    """Return the cached entry ({"time", "lines"}) for a key, if any."""
+    entry = load_json(f"{key}.json", shared=True)
+    if isinstance(entry, dict) and isinstance(entry.get("lines"), list):
+        return entry
+    return None
+
+
+def _lines(entry: dict) -> list[str]:
+    """An entry's lines, still marked as a failure if the render failed."""
+    return RenderFailure(entry["lines"]) if entry.get("failed") else entry["lines"]
+
+
+def _is_fresh(entry: dict | None, ttl: float, token: str | None, failure_ttl: float) -> bool:
+    if entry is None:
+        return False
+    age = time.time() - entry.get("time", 0)
+    if entry.get("failed"):
+        return age < failure_ttl
+    if token is not None:
+        # Declared dependencies decide freshness, not age
+        return entry.get("deps") == token
+    return age < ttl
+
+
+def _open_lock(path: Path) -> int:
+    """Open a lock file any user can flock, creating it if needed.
+
+    flock() needs no write access, so the file is opened read-only. An
+    existing file is opened without O_CREAT, which fs.protected_regular
+    refuses for other users' files in sticky directories.
+    """
+    try:
+        return os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        pass
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        return os.open(path, os.O_RDONLY)
+    # Not left to the umask, which may be 077
+    os.fchmod(fd, 0o644)
+    return fd
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+
+def render_single_flight(key: str, render: Callable[[], list[str]], ttl: float,
+                         wait: float = 2.0, dependencies: list[str] | None = None,
+                         failure_ttl: float = FAILURE_TTL) -> list[str]:
+    """Render through the shared cache with one refresher per key.
+
+    Args:
+        key: Cache key from cache_key().
+        render: Produces fresh lines.
+        ttl: Seconds a cached result stays fresh.
+        wait: How long to wait for another process's refresh before
+            using the previous value.
+        dependencies: Files the output is derived from. While any of
+            them exist, the cached result stays fresh until one changes
+            and ``ttl`` is ignored.
+        failure_ttl: Seconds a RenderFailure stays fresh; it is never
+            tied to the dependencies.
+
+    Returns:
+        Fresh or cached lines.
+    """
+    token = dependency_token(dependencies) if dependencies else None
+    if token is None and ttl <= 0:
+        return render()
+
+    entry = load_cached(key)
+    if _is_fresh(entry, ttl, token, failure_ttl):
+        return _lines(entry)
+
+    try:
+        directory = shared_cache_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        fd = _open_lock(directory / f"{key}.lock")
+    except OSError:
+        # No usable cache directory: behave as if uncached
+        return render()
+
+    try:
+        if not _try_lock(fd):
+            # Someone else is refreshing; wait for them to finish
+            deadline = time.monotonic() + wait
+            while not _try_lock(fd):
+                if time.monotonic() >= deadline:
+                    return _lines(entry) if entry is not None else render()
+                time.sleep(POLL_INTERVAL)
+
+            entry = load_cached(key)
+            if _is_fresh(entry, ttl, token, failure_ttl):
+                return _lines(entry)
+
+        lines = render()
+        if isinstance(lines, RenderFailure):
+            save_json(f"{key}.json", {"time": time.time(), "lines": lines, "failed": True},
+                      shared=True)
+        else:
+            save_json(f"{key}.json", {"time": time.time(), "lines": lines, "deps": token},
+                      shared=True)
+        return lines
+    finally:
+        os.close(fd)
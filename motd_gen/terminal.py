@@ -0,0 +1,250 @@
+"""Terminal capability detection and low-overhead frame output."""
+
+import os
+import re
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TextIO
+
+CLEAR_SCREEN = "\033[H\033[2J\033[3J"
+ERASE_LINE = "\r\033[K"
+
+_SGR_PATTERN = re.compile(r"\033\[([0-9;]*)m")
+
+# Attributes whose effect is visible on whitespace (underline, blink,
+# reverse, strikethrough); bold/dim/italic and foreground are not.
+_VISIBLE_ON_SPACE = frozenset({4, 5, 7, 9})
+
+
+@dataclass(frozen=True)
+class TerminalCapabilities:
+    """What the output stream supports, detected once per process."""
+
+    is_tty: bool
+    color: bool
+    colors: int
+    width: int
+
+
+@lru_cache(maxsize=None)
+def _detect(fd: int) -> TerminalCapabilities:
+    """Detect capabilities for a file descriptor."""
+    is_tty = os.isatty(fd)
+    term = os.environ.get("TERM", "")
+    colorterm = os.environ.get("COLORTERM", "").lower()
+
+    # FORCE_COLOR keeps colors when output is captured for later display,
+    # e.g. update-motd.d writing /run/motd.dynamic
+    forced = bool(os.environ.get("FORCE_COLOR"))
+    color = (is_tty or forced) and "NO_COLOR" not in os.environ and term != "dumb"
+    if not color:
+        colors = 0
+    elif colorterm in ("truecolor", "24bit"):
+        colors = 1 << 24
+    elif "256color" in term:
+        colors = 256
+    else:
+        colors = 16
+
+    try:
+        width = os.get_terminal_size(fd).columns
+    except OSError:
+        width = 80
+
+    return TerminalCapabilities(is_tty=is_tty, color=color, colors=colors, width=width)
+
+
+def detect_capabilities(stream: TextIO | None = None) -> TerminalCapabilities:
+    """Return cached terminal capabilities for a stream (stdout by default)."""
+    stream = stream or sys.stdout
+    try:
+        fd = stream.fileno()
+    except (AttributeError, OSError, ValueError):
+        return TerminalCapabilities(is_tty=False, color=False, colors=0, width=80)
+    return _detect(fd)
+
+
+class _SgrState:
+    """Current graphic rendition: attribute set plus fg/bg parameter strings."""
+
+    __slots__ = ("attrs", "fg", "bg")
+
+    def __init__(self) -> None:
+        self.attrs: frozenset[int] = frozenset()
+        self.fg = ""
+        self.bg = ""
+
+    def copy(self) -> "_SgrState":
+        state = _SgrState()
+        state.attrs, state.fg, state.bg = self.attrs, self.fg, self.bg
+        return state
+
+    def key(self) -> tuple:
+        return (self.attrs, self.fg, self.bg)
+
+    def is_default(self) -> bool:
+        return not self.attrs and not self.fg and not self.bg
+
+    def visible_on_space(self) -> bool:
+        return bool(self.bg) or bool(self.attrs & _VISIBLE_ON_SPACE)
+
+    def apply(self, params: str, colors: int) -> None:
+        """Apply an SGR parameter string such as '1;36' to this state."""
+        codes = [int(p) if p else 0 for p in params.split(";")] if params else [0]
+        attrs = set(self.attrs)
+        i = 0
+        while i < len(codes):
+            code = codes[i]
+            if code == 0:
+                attrs.clear()
+                self.fg = self.bg = ""
+            elif 1 <= code <= 9:
+                attrs.add(code)
+            elif code == 22:
+                attrs.discard(1)
+                attrs.discard(2)
+            elif 23 <= code <= 29:
+                attrs.discard(code - 20)
+            elif 30 <= code <= 37 or 90 <= code <= 97:
+                self.fg = str(code)
+            elif 40 <= code <= 47 or 100 <= code <= 107:
+                self.bg = str(code)
+            elif code == 39:
+                self.fg = ""
+            elif code == 49:
+                self.bg = ""
+            elif code in (38, 48) and i + 1 < len(codes):
+                mode = codes[i + 1]
+                span = 3 if mode == 5 else 5
+                value = ";".join(str(c) for c in codes[i:i + span])
+                if colors < (256 if mode == 5 else 1 << 24):
+                    value = ""
+                if code == 38:
+                    self.fg = value
+                else:
+                    self.bg = value
+                i += span - 1
+            i += 1
+        self.attrs = frozenset(attrs)
+
+    def params(self) -> str:
+        """Return the parameter string that sets this state from a reset."""
+        parts = [str(a) for a in sorted(self.attrs)]
+        if self.fg:
+            parts.append(self.fg)
+        if self.bg:
+            parts.append(self.bg)
+        return ";".join(parts)
+
+
+def _transition(current: _SgrState, target: _SgrState) -> str:
+    """Return the shortest SGR sequence moving from current to target."""
+    if target.is_default():
+        return "\033[0m"
+
+    removed = (current.attrs - target.attrs) or (current.fg and not target.fg) \
+        or (current.bg and not target.bg)
+    if removed:
+        return f"\033[0;{target.params()}m"
+
+    parts = [str(a) for a in sorted(target.attrs - current.attrs)]
+    if target.fg != current.fg:
+        parts.append(target.fg)
+    if target.bg != current.bg:
+        parts.append(target.bg)
+    return f"\033[{';'.join(parts)}m"
+
+
+def optimize_sgr(text: str, colors: int = 16) -> str:
+    """Collapse redundant SGR sequences in a rendered frame.
+
+    Sequences are applied to a virtual rendition state and only emitted
+    when visible text actually needs a different state, so per-line
+    ``prefix...RESET`` pairs from colorize() merge across lines and
+    adjacent cells. With ``colors`` of 0 all SGR sequences are removed.
+    The result always ends in the default rendition.
+
+    Args:
+        text: Frame text containing ANSI SGR sequences.
+        colors: Number of colors the terminal supports.
+
+    Returns:
+        Equivalent text with minimal SGR output.
+    """
+    if colors <= 0:
+        return _SGR_PATTERN.sub("", text)
+
+    out: list[str] = []
+    current = _SgrState()
+    pending = _SgrState()
+    pos = 0
+
+    for match in _SGR_PATTERN.finditer(text):
+        current = _emit_text(text[pos:match.start()], current, pending, out)
+        pending.apply(match.group(1), colors)
+        pos = match.end()
+
+    current = _emit_text(text[pos:], current, pending, out)
+
+    if not current.is_default():
+        out.append("\033[0m")
+
+    return "".join(out)
+
+
+def _emit_text(segment: str, current: _SgrState, pending: _SgrState, out: list[str]) -> _SgrState:
+    """Append a text segment, preceded by a state change only if it is visible.
+
+    Returns:
+        The rendition state in effect after the segment.
+    """
+    if not segment or pending.key() == current.key():
+        out.append(segment)
+        return current
+
+    if segment.isspace() and not current.visible_on_space() and not pending.visible_on_space():
+        out.append(segment)
+        return current
+
+    out.append(_transition(current, pending))
+    out.append(segment)
+    return pending.copy()
+
+
+def write_frame(frame: str, clear: bool = True, stream: TextIO | None = None) -> int:
+    """Write a complete frame to the terminal in a single buffered write.
+
+    Clearing uses an escape sequence instead of spawning ``clear``, and is
+    skipped when the stream is not a terminal.
+
+    Args:
+        frame: The rendered MOTD text.
+        clear: Whether to clear the screen first.
+        stream: Output stream, stdout by default.
+
+    Returns:
+        The number of bytes written.
+    """
+    stream = stream or sys.stdout
+    caps = detect_capabilities(stream)
+
+    prefix = CLEAR_SCREEN if clear and caps.is_tty else ""
+    data = (prefix + optimize_sgr(frame, caps.colors) + "\n").encode(
+        getattr(stream, "encoding", None) or "utf-8", errors="replace"
+    )
+
+    try:
+        fd = stream.fileno()
+    except (AttributeError, OSError, ValueError):
+        # In-memory streams (tests, embedding) have no descriptor
+        stream.write(data.decode(getattr(stream, "encoding", None) or "utf-8"))
+        stream.flush()
+        return len(data)
+
+    stream.flush()
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+    return len(data)
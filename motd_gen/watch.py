@@ -0,0 +1,140 @@
+"""Change detection for files that widget output depends on.
+
+A dependency token is a hash of (mtime, size, inode) for each path, so
+it can be stored in the shared cache and compared by any process. The
+default tracker stats every path on each call, which suits one-shot
+runs. Long-running modes can switch to the inotify tracker, which only
+re-stats a path after the kernel reports an event on it.
+"""
+
+import hashlib
+import os
+import struct
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+# Content, metadata, and entries being created, removed or renamed
+IN_WATCH_MASK = (0x002 | 0x004 | 0x008 | 0x040 | 0x080 | 0x100 | 0x200 | 0x400 | 0x800)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _stat_entry(path: str) -> str | None:
+    """One path's fingerprint, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{path}:{st.st_mtime_ns}:{st.st_size}:{st.st_ino}"
+
+
+def _combine(entries: list[str | None]) -> str | None:
+    """Hash per-path entries; None when no dependency exists at all."""
+    if all(entry is None for entry in entries):
+        return None
+    blob = "\n".join(entry or "-" for entry in entries)
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+class StatTracker:
+    """Computes dependency tokens by stat()ing every path."""
+
+    def token(self, paths: list[str]) -> str | None:
+        """Return the current token for ``paths``.
+
+        Returns:
+            A hex digest, or None if none of the paths exist (the caller
+            should then fall back to time-based expiry).
+        """
+        return _combine([_stat_entry(path) for path in paths])
+
+
+class InotifyTracker(StatTracker):
+    """Stat tracker that skips the stat while inotify reports no change.
+
+    Each path and its parent directory are watched, so in-place writes
+    and replacement by rename are both seen.
+    """
+
+    def __init__(self) -> None:
+        # Only long-running modes get here; one-shot runs skip the import
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._paths_by_wd: dict[int, set[str]] = {}
+        self._entries: dict[str, str | None] = {}
+
+    def close(self) -> None:
+        """Release the inotify descriptor."""
+        os.close(self._fd)
+
+    def token(self, paths: list[str]) -> str | None:
+        self._drain()
+        entries = []
+        for path in paths:
+            if path not in self._entries:
+                self._watch(path)
+                self._entries[path] = _stat_entry(path)
+            entries.append(self._entries[path])
+        return _combine(entries)
+
+    def _watch(self, path: str) -> None:
+        for target in (path, os.path.dirname(path.rstrip("/")) or "/"):
+            wd = self._add_watch(self._fd, os.fsencode(target), IN_WATCH_MASK)
+            if wd >= 0:
+                self._paths_by_wd.setdefault(wd, set()).add(path)
+
+    def _drain(self) -> None:
+        """Read pending events and forget the entries they affect."""
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(data):
+                wd, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size + length
+                if wd == -1:
+                    # IN_Q_OVERFLOW: events were dropped, so nothing is known fresh
+                    self._entries.clear()
+                    continue
+                for path in self._paths_by_wd.get(wd, ()):
+                    # Re-stat (and re-watch, if it was replaced) on next use
+                    self._entries.pop(path, None)
+
+
+_tracker: StatTracker = StatTracker()
+
+
+def get_tracker() -> StatTracker:
+    """The tracker in use by this process."""
+    return _tracker
+
+
+def use_inotify() -> bool:
+    """Switch this process to inotify-based tracking, if available.
+
+    Returns:
+        True if inotify is now in use.
+    """
+    global _tracker
+    if isinstance(_tracker, InotifyTracker):
+        return True
+    try:
+        _tracker = InotifyTracker()
+    except (OSError, AttributeError):
+        return False
+    return True
+
+
+def dependency_token(paths: list[str]) -> str | None:
+    """Token for ``paths`` from the active tracker."""
+    return _tracker.token(paths)
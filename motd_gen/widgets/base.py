@@ -1,7 +1,19 @@
 """Abstract base class defining the widget contract."""
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import requests
+
+
+class RenderFailure(list):
+    """Lines a widget returns when it could not collect its data.
+
+    Callers treat it as the plain list of lines it is; the render cache
+    keeps it only briefly (``failure_ttl``) so one failed collection is
+    not shown to every login until the normal TTL passes.
+    """
 
 
 class BaseWidget(ABC):
@@ -9,19 +21,59 @@ class BaseWidget(ABC):
 
     Each widget receives its own config section and returns
     rendered lines for the MOTD output.
+
+    Widgets with expensive collectors set ``cache_ttl`` so their output is
+    shared across concurrent logins; the ``cache_ttl`` config key overrides
+    it and 0 disables caching. ``priority`` ("low", "normal", "high") and
+    ``cost`` ("cheap", "moderate", "expensive") guide the load policy and
+    can likewise be overridden per widget in the config; a widget whose
+    cost depends on its config overrides ``cost_for()``.
+
+    Widgets whose output is derived from a few files return them from
+    ``dependencies()``; the cached output is then reused until one of
+    those files changes, however old it is. The ``dependencies`` config
+    key overrides the list.
+
+    A render that failed to collect its data returns its message as a
+    ``RenderFailure`` instead of a plain list.
+
+    Widgets whose output depends on ``width`` set ``width_dependent`` so
+    the engine re-renders them, alone, for each width variant. Widgets
+    whose output depends on who renders it (privileges, the user) set
+    ``per_user`` so cached output is never shown to another user.
+
+    ``session`` is an optional shared requests.Session that HTTP widgets
+    use instead of one-off connections; MotdEngine sets it so
+    connections stay open between renders.
     """
 
+    cache_ttl: float = 0
+    priority: str = "normal"
+    cost: str = "cheap"
+    width_dependent: bool = False
+    per_user: bool = False
+    session: "requests.Session | None" = None
+
     def __init__(self, config: dict[str, Any], width: int = 80) -> None:
         """Initialize with widget-specific config from motd.json."""
         self.config = config
         self.width = width
 
+    @classmethod
+    def cost_for(cls, config: dict[str, Any]) -> str:
+        """Cost of rendering with ``config``, before any ``cost`` override."""
+        return cls.cost
+
     @property
     @abstractmethod
     def name(self) -> str:
         """Unique identifier for this widget, matches config key."""
         ...
 
+    def dependencies(self) -> list[str]:
+        """Files and directories the rendered output is derived from."""
+        return []
+
     @abstractmethod
     def render(self) -> list[str]:
         """Return lines of text to display in the MOTD.
@@ -1,9 +1,9 @@
 """Hostname ASCII art banner widget."""
 
-import socket
 import pyfiglet
-from motd_gen.widgets.base import BaseWidget
+from motd_gen.widgets.base import BaseWidget, RenderFailure
 from motd_gen.colors import colorize
+from motd_gen.facts import get_facts
 
 
 class HostnameWidget(BaseWidget):
@@ -16,7 +16,7 @@ class HostnameWidget(BaseWidget):
     def render(self) -> list[str]:
         """Render hostname as ASCII art using pyfiglet."""
         try:
-            display_name = self.config.get("custom_name", socket.gethostname())
+            display_name = self.config.get("custom_name") or get_facts()["hostname"]
             font = self.config.get("font", "slant")
             color = self.config.get("color", "")
             bold = self.config.get("bold", False)
@@ -29,4 +29,4 @@ class HostnameWidget(BaseWidget):
 
             return lines
         except Exception as e:
-            return [f"[hostname error: {e}]"]
+            return RenderFailure([f"[hostname error: {e}]"])
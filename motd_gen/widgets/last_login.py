@@ -1,21 +1,109 @@
-"""Last login widget using systemd journal."""
+"""Last login widget using systemd journal or lastlog."""
 
+import os
+import platform
+import struct
 import subprocess
-from motd_gen.widgets.base import BaseWidget
+import time
+from typing import Any
+from motd_gen.cache import load_json, save_json
+from motd_gen.widgets.base import BaseWidget, RenderFailure
+
+LASTLOG_PATH = "/var/log/lastlog"
+
+# struct lastlog from <lastlog.h>: login time, tty line, remote host.
+# The file is sparse and indexed by uid, so a record sits at uid * size.
+# ll_time is 32 bits on 32-bit systems and where glibc defines
+# __WORDSIZE_TIME64_COMPAT32 (292-byte records), and a 64-bit time_t on
+# other 64-bit ABIs such as aarch64 and riscv64 (296-byte records).
+LASTLOG_RECORD_32 = struct.Struct("=i32s256s")
+LASTLOG_RECORD_64 = struct.Struct("=q32s256s")
+COMPAT32_MACHINES = ("x86_64", "amd64", "ppc64", "ppc64le", "s390x", "sparc64", "mips64")
+
+
+def lastlog_record(time_bits: int | None = None) -> struct.Struct:
+    """The lastlog record layout for an ``ll_time`` of ``time_bits`` bits.
+
+    By default the width is that of the running platform.
+    """
+    if time_bits is None:
+        compat32 = struct.calcsize("P") == 4 or platform.machine().lower() in COMPAT32_MACHINES
+        time_bits = 32 if compat32 else 64
+    return LASTLOG_RECORD_64 if time_bits == 64 else LASTLOG_RECORD_32
+
+
+LASTLOG_RECORD = lastlog_record()
+
+
+def read_lastlog(uid: int, path: str = LASTLOG_PATH,
+                 record: struct.Struct = LASTLOG_RECORD) -> tuple[int, str, str] | None:
+    """Read one user's lastlog record with a single positioned read.
+
+    Returns:
+        (time, line, host), or None if the user never logged in.
+    """
+    # os.pread rather than open(): the file's apparent size can reach
+    # hundreds of GB for high uids, so it must never be read whole
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        data = os.pread(fd, record.size, uid * record.size)
+    finally:
+        os.close(fd)
+
+    if len(data) < record.size:
+        return None
+    login_time, line, host = record.unpack(data)
+    if login_time == 0:
+        return None
+    return (login_time, line.split(b"\0", 1)[0].decode(errors="replace"),
+            host.split(b"\0", 1)[0].decode(errors="replace"))
 
 
 class LastLoginWidget(BaseWidget):
-    """Displays recent login sessions from systemd-logind."""
+    """Displays recent login sessions from systemd-logind.
+
+    With ``"mode": "self"`` it instead shows the current user's previous
+    login from lastlog (``lastlog_file``), at constant cost however many
+    users or sessions there are. ``lastlog_time_bits`` (32 or 64)
+    overrides the platform's record layout.
+    """
+
+    cache_ttl = 30
+    priority = "low"
+    cost = "expensive"
+    # Output depends on the privileges of whoever renders it
+    per_user = True
+
+    def __init__(self, config: dict[str, Any], width: int = 80) -> None:
+        super().__init__(config, width)
+        if config.get("mode") == "self":
+            # Output is per user and a single read, so never share it
+            # through the render cache
+            self.cache_ttl = 0
+
+    @classmethod
+    def cost_for(cls, config: dict[str, Any]) -> str:
+        # One positioned read: nothing to save by degrading it under load
+        return "cheap" if config.get("mode") == "self" else cls.cost
 
     @property
     def name(self) -> str:
         return "last_login"
 
+    def dependencies(self) -> list[str]:
+        if self.config.get("mode") == "self":
+            return []
+        # Every login appends a wtmp record (wtmpdb on newer systems)
+        return ["/var/log/wtmp", "/var/lib/wtmpdb/wtmp.db"]
+
     def render(self) -> list[str]:
         """Parse journalctl for recent login sessions."""
         label = self.config.get("label", "Last Login")
         count = self.config.get("count", 3)
 
+        if self.config.get("mode") == "self":
+            return self._render_self(label)
+
         try:
             result = subprocess.run(
                 [
@@ -56,4 +144,45 @@ class LastLoginWidget(BaseWidget):
             return lines
 
         except Exception as e:
-            return [f"{label}: unavailable ({e})"]
\ No newline at end of file
+            return RenderFailure([f"{label}: unavailable ({e})"])
+
+    def _render_self(self, label: str) -> list[str]:
+        """Show the current user's previous login from lastlog."""
+        uid = self.config.get("uid", os.getuid())
+        try:
+            record = read_lastlog(uid, self.config.get("lastlog_file", LASTLOG_PATH),
+                                  lastlog_record(self.config.get("lastlog_time_bits")))
+        except OSError as e:
+            return RenderFailure([f"{label}: unavailable ({e.strerror})"])
+
+        if self.config.get("record_is_current", True):
+            record = self._previous(uid, record)
+        if record is None:
+            return [f"{label}: none recorded"]
+
+        login_time, line, host = record
+        text = f"{label}: {time.strftime('%a %b %d %H:%M', time.localtime(login_time))}"
+        if host:
+            text += f" from {host}"
+        if line:
+            text += f" on {line}"
+        return [text]
+
+    def _previous(self, uid: int, record: tuple[int, str, str] | None) -> tuple[int, str, str] | None:
+        """Return the login before ``record``.
+
+        By the time the MOTD renders, login has already overwritten
+        lastlog with the current session, so the last two distinct
+        records are kept in a small per-uid index.
+        """
+        name = f"last-login-{uid}.json"
+        index = load_json(name)
+        if not isinstance(index, dict):
+            index = {}
+
+        if record is not None and index.get("current") != list(record):
+            index = {"current": list(record), "previous": index.get("current")}
+            save_json(name, index)
+
+        previous = index.get("previous")
+        return tuple(previous) if previous else None
@@ -1,14 +1,17 @@
 """Network information widget."""
 
-import socket
 import subprocess
-import requests
-from motd_gen.widgets.base import BaseWidget
+from motd_gen.facts import get_facts
+from motd_gen.widgets.base import BaseWidget, RenderFailure
+from motd_gen.widgets.public_ip import lookup_public_ip
 
 
 class NetworkWidget(BaseWidget):
     """Displays hostname, IP addresses, gateway, and public IP in two columns."""
 
+    cache_ttl = 60
+    cost = "expensive"
+
     @property
     def name(self) -> str:
         return "network"
@@ -39,18 +42,19 @@ class NetworkWidget(BaseWidget):
 
         # Right column: hostname and public IP
         try:
-            hostname = socket.gethostname()
+            hostname = get_facts()["hostname"]
             right_entries.append(f"Hostname:  {hostname}")
         except Exception:
             right_entries.append("Hostname:  unavailable")
 
         if show_public_ip:
-            try:
-                response = requests.get("https://api.ipify.org", timeout=public_ip_timeout)
-                response.raise_for_status()
-                right_entries.append(f"Public IP: {response.text}")
-            except Exception:
+            address, note = lookup_public_ip(self.config, public_ip_timeout)
+            if address is None:
                 right_entries.append("Public IP: unavailable")
+            elif note:
+                right_entries.append(f"Public IP: {address} ({note})")
+            else:
+                right_entries.append(f"Public IP: {address}")
 
         # Pad columns to same height
         max_height = max(len(left_entries), len(right_entries))
@@ -71,6 +75,9 @@ class NetworkWidget(BaseWidget):
             else:
                 lines.append(left)
 
+        if any(e.endswith(": unavailable") for e in left_entries + right_entries):
+            # Retried soon rather than reused for the full cache_ttl
+            return RenderFailure(lines)
         return lines
 
     def _get_interfaces(self) -> list[tuple[str, str]]:
@@ -1,9 +1,7 @@
 """Operating system information widget."""
 
-from cProfile import label
-import platform
-from pathlib import Path
-from motd_gen.widgets.base import BaseWidget
+from motd_gen.facts import get_facts
+from motd_gen.widgets.base import BaseWidget, RenderFailure
 
 
 class OSInfoWidget(BaseWidget):
@@ -14,14 +12,15 @@ class OSInfoWidget(BaseWidget):
         return "os_info"
 
     def render(self) -> list[str]:
-        """Read OS information from /etc/os-release."""
+        """Read OS information from the cached /etc/os-release facts."""
         label = self.config.get("label", "OS")
 
         try:
-            os_data = self._parse_os_release()
+            facts = get_facts()
+            os_data = facts["os_release"]
             pretty_name = os_data.get("PRETTY_NAME", "Unknown")
             codename = os_data.get("VERSION_CODENAME", "")
-            kernel = platform.release()
+            kernel = facts["kernel"]
 
             parts = [f"{label}: {pretty_name}"]
             if codename:
@@ -35,19 +34,5 @@ class OSInfoWidget(BaseWidget):
             return parts
 
         except Exception as e:
-            return [f"{label}: unavailable ({e})"]
+            return RenderFailure([f"{label}: unavailable ({e})"])
 
-    def _parse_os_release(self) -> dict[str, str]:
-        """Parse /etc/os-release into a dictionary."""
-        data = {}
-        path = Path("/etc/os-release")
-
-        if not path.exists():
-            return data
-
-        for line in path.read_text().strip().split("\n"):
-            if "=" in line:
-                key, value = line.split("=", 1)
-                data[key] = value.strip('"')
-
-        return data
\ No newline at end of file
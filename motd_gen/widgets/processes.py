@@ -1,22 +1,113 @@
-"""Process count widget."""
+"""Process count and top consumers widget."""
 
-import psutil
-from motd_gen.widgets.base import BaseWidget
+import heapq
+import os
+import time
+from motd_gen.cache import load_json, read_boot_id, save_json
+from motd_gen.facts import get_facts
+from motd_gen.widgets.base import BaseWidget, RenderFailure
+
+CACHE_NAME = "processes.json"
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+MIN_DELTA_SECONDS = 1.0
 
 
 class ProcessesWidget(BaseWidget):
-    """Displays the number of running processes."""
+    """Displays the number of running processes and, optionally, the top N.
+
+    Top mode reads only /proc/<pid>/stat for each process in a single
+    pass. CPU usage is the delta against the snapshot persisted by the
+    previous run, so no sampling sleep is needed; without a usable
+    snapshot the lifetime average is shown instead.
+    """
 
     @property
     def name(self) -> str:
         return "processes"
 
     def render(self) -> list[str]:
-        """Count running processes."""
+        """Count running processes and list the top consumers."""
         label = self.config.get("label", "Processes")
+        top = self.config.get("top", 0)
+        proc_root = self.config.get("proc_root", "/proc")
 
         try:
-            count = len(psutil.pids())
-            return [f"{label}: {count}"]
+            pids = [entry for entry in os.listdir(proc_root) if entry.isdigit()]
+            count = len(pids)
+
+            if not top:
+                return [f"{label}: {count}"]
+
+            max_scan = self.config.get("max_scan", 50000)
+            sort_key = self.config.get("sort", "cpu")
+            scanned = pids[:max_scan]
+            rows = self._sample(proc_root, scanned)
+
+            key_index = 2 if sort_key == "memory" else 1
+            best = heapq.nlargest(top, rows, key=lambda row: row[key_index])
+
+            header = f"{label}: {count}"
+            if len(scanned) < count:
+                header += f" (top of {len(scanned)} scanned)"
+
+            lines = [header, f"  {'PID':>7}  {'CPU%':>5}  {'MEM%':>5}  COMMAND"]
+            for pid, cpu, mem, comm in best:
+                lines.append(f"  {pid:>7}  {cpu:5.1f}  {mem:5.1f}  {comm}")
+            return lines
+
         except Exception as e:
-            return [f"{label}: unavailable ({e})"]
\ No newline at end of file
+            return RenderFailure([f"{label}: unavailable ({e})"])
+
+    def _sample(self, proc_root: str, pids: list[str]) -> list[tuple[str, float, float, str]]:
+        """Read each process's stat once and return (pid, cpu%, mem%, comm) rows."""
+        now = time.monotonic()
+        boot_id = read_boot_id()
+        uptime = self._uptime(proc_root)
+        total_mem = get_facts()["mem_total"]
+
+        previous = load_json(CACHE_NAME)
+        prev_ticks: dict = {}
+        elapsed = 0.0
+        if isinstance(previous, dict) and previous.get("boot_id") == boot_id:
+            elapsed = now - previous.get("time", now)
+            prev_ticks = previous.get("procs", {})
+        # Very short intervals give noisy deltas; prefer the lifetime average
+        use_delta = elapsed >= MIN_DELTA_SECONDS and bool(prev_ticks)
+
+        rows = []
+        snapshot = {}
+        for pid in pids:
+            try:
+                with open(f"{proc_root}/{pid}/stat", "rb") as f:
+                    data = f.read()
+            except OSError:
+                # Process exited between listdir and open
+                continue
+
+            head, _, tail = data.rpartition(b")")
+            comm = head.split(b"(", 1)[-1].decode(errors="replace")
+            fields = tail.split()
+            ticks = int(fields[11]) + int(fields[12])
+            start = int(fields[19])
+            rss = int(fields[21])
+            snapshot[pid] = [start, ticks]
+
+            prev = prev_ticks.get(pid)
+            if use_delta and prev is not None and prev[0] == start:
+                cpu = (ticks - prev[1]) / CLK_TCK / elapsed * 100
+            else:
+                # New process or no snapshot: average since it started
+                lifetime = uptime - start / CLK_TCK
+                cpu = ticks / CLK_TCK / lifetime * 100 if lifetime > 0 else 0.0
+
+            mem = rss * PAGE_SIZE / total_mem * 100 if total_mem > 0 else 0.0
+            rows.append((pid, max(cpu, 0.0), mem, comm))
+
+        save_json(CACHE_NAME, {"boot_id": boot_id, "time": now, "procs": snapshot})
+        return rows
+
+    def _uptime(self, proc_root: str) -> float:
+        """Seconds since boot, from /proc/uptime."""
+        with open(f"{proc_root}/uptime", "r") as f:
+            return float(f.read().split()[0])
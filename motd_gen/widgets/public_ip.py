@@ -1,12 +1,60 @@
 """Public IP address widget."""
 
-import requests
-from motd_gen.widgets.base import BaseWidget
+from motd_gen.circuit import CircuitBreaker, CircuitOpenError
+from motd_gen.ip_resolver import PublicIPResolver
+from motd_gen.widgets.base import BaseWidget, RenderFailure
+
+
+def lookup_public_ip(config: dict, timeout: float) -> tuple[str | None, str]:
+    """Resolve the public IP, racing the configured providers.
+
+    An answer cached while the local addresses and default route were
+    the same is returned without any network traffic. Otherwise the
+    providers race through the shared circuit breaker.
+
+    Args:
+        config: Widget config, for provider and circuit breaker settings.
+        timeout: Maximum time to wait for an answer, in seconds.
+
+    Returns:
+        A (value, note) pair. On failure the last known address is
+        returned with note "cached", or None with a short reason.
+    """
+    resolver = PublicIPResolver(config)
+    try:
+        address = resolver.cached()
+    except Exception:
+        address = None
+    if address:
+        return address, ""
+
+    # Imported only once a lookup is needed; cached answers skip it
+    import requests
+
+    breaker = CircuitBreaker("public_ip", config)
+    try:
+        return breaker.call(resolver.resolve, timeout), ""
+    except CircuitOpenError:
+        reason = "offline"
+    except requests.ConnectionError:
+        reason = "no internet connection"
+    except requests.Timeout:
+        reason = "request timed out"
+    except Exception as e:
+        reason = f"unavailable ({e})"
+
+    if breaker.last_value:
+        return breaker.last_value, "cached"
+    return None, reason
 
 
 class PublicIPWidget(BaseWidget):
     """Displays the public-facing IP address."""
 
+    cache_ttl = 300
+    priority = "low"
+    cost = "expensive"
+
     @property
     def name(self) -> str:
         return "public_ip"
@@ -16,13 +64,9 @@ class PublicIPWidget(BaseWidget):
         label = self.config.get("label", "Public IP")
         timeout = self.config.get("timeout", 5)
 
-        try:
-            response = requests.get("https://api.ipify.org", timeout=timeout)
-            response.raise_for_status()
-            return [f"{label}: {response.text}"]
-        except requests.ConnectionError:
-            return [f"{label}: no internet connection"]
-        except requests.Timeout:
-            return [f"{label}: request timed out"]
-        except Exception as e:
-            return [f"{label}: unavailable ({e})"]
\ No newline at end of file
+        address, note = lookup_public_ip(self.config, timeout)
+        if address is None:
+            return RenderFailure([f"{label}: {note}"])
+        if note:
+            return [f"{label}: {address} ({note})"]
+        return [f"{label}: {address}"]
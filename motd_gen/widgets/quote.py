@@ -3,7 +3,37 @@
 import json
 import random
 from pathlib import Path
-from motd_gen.widgets.base import BaseWidget
+from motd_gen.watch import dependency_token
+from motd_gen.widgets.base import BaseWidget, RenderFailure
+
+# Shipped with the source tree, and packaged into bundles by motd-gen bundle
+DEFAULT_QUOTES_FILE = str(Path(__file__).parent.parent.parent / "config" / "quotes.json")
+
+# Parsed quote files by path, with the dependency token they were read at
+_loaded: dict[str, tuple[str, list]] = {}
+
+
+def load_quotes(path: str) -> list:
+    """Parse a quotes file, reusing the last parse while it is unchanged.
+
+    The output is a random pick per login, so the parsed file is cached
+    in-process rather than the rendered lines; long-running modes with
+    inotify skip both the read and the stat.
+    """
+    token = dependency_token([path])
+    cached = _loaded.get(path)
+    if token is not None and cached is not None and cached[0] == token:
+        return cached[1]
+
+    if path == DEFAULT_QUOTES_FILE:
+        # Through this module's loader, which also reads from a bundle's zip
+        quotes = json.loads(__loader__.get_data(path))
+    else:
+        with open(path, "r") as f:
+            quotes = json.load(f)
+    if token is not None:
+        _loaded[path] = (token, quotes)
+    return quotes
 
 
 class QuoteWidget(BaseWidget):
@@ -15,14 +45,10 @@ class QuoteWidget(BaseWidget):
 
     def render(self) -> list[str]:
         """Load quotes file and pick one at random."""
-        default_path = str(
-            Path(__file__).parent.parent.parent / "config" / "quotes.json"
-        )
-        quotes_path = self.config.get("quotes_file", default_path)
+        quotes_path = self.config.get("quotes_file", DEFAULT_QUOTES_FILE)
 
         try:
-            with open(quotes_path, "r") as f:
-                quotes = json.load(f)
+            quotes = load_quotes(quotes_path)
 
             if not quotes:
                 return ["No quotes found."]
@@ -40,6 +66,6 @@ class QuoteWidget(BaseWidget):
             return lines
 
         except FileNotFoundError:
-            return ["Quotes file not found."]
+            return RenderFailure(["Quotes file not found."])
         except Exception as e:
-            return [f"[quote error: {e}]"]
+            return RenderFailure([f"[quote error: {e}]"])
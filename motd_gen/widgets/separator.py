@@ -7,6 +7,8 @@ from motd_gen.colors import colorize
 class SeparatorWidget(BaseWidget):
     """Renders a horizontal separator line."""
 
+    width_dependent = True
+
     @property
     def name(self) -> str:
         return "separator"
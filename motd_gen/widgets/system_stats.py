@@ -1,13 +1,123 @@
 """System stats widget: CPU, memory, and disk usage."""
 
+import fnmatch
 import math
+import os
+import select
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from typing import Any, Callable
 import psutil
 from motd_gen.widgets.base import BaseWidget
 
+# Filesystems considered real disks when disk_paths is "auto"
+DEFAULT_FSTYPES = ["ext2", "ext3", "ext4", "xfs", "btrfs", "zfs", "f2fs",
+                   "vfat", "exfat", "ntfs", "ntfs3", "fuseblk", "nfs", "nfs4",
+                   "cifs", "smb3", "fuse.sshfs"]
+DEFAULT_EXCLUDE = ["/boot/efi", "/snap/*", "/var/snap/*", "/run/*"]
+
+DiskUsage = namedtuple("DiskUsage", "total used free percent")
+
+# Runs in the probe process: one thread per mount (given by argv index),
+# each printing "<index> <statvfs fields>" or "<index> error <message>"
+_PROBE_SCRIPT = """\
+import os, sys, threading
+lock = threading.Lock()
+def probe(i):
+    try:
+        st = os.statvfs(sys.argv[i])
+        line = f"{i} {st.f_blocks} {st.f_bfree} {st.f_bavail} {st.f_frsize}"
+    except OSError as e:
+        line = f"{i} error {e.strerror}"
+    with lock:
+        sys.stdout.write(line + "\\n")
+        sys.stdout.flush()
+for i in range(1, len(sys.argv)):
+    threading.Thread(target=probe, args=(i,)).start()
+"""
+
+
+def _parse_probe_line(line: str) -> tuple[int, object]:
+    """Turn one probe output line into (path index, DiskUsage or OSError).
+
+    Usage is computed the way psutil.disk_usage() does it.
+    """
+    index, _, rest = line.partition(" ")
+    if rest.startswith("error "):
+        return int(index), OSError(rest[len("error "):])
+    blocks, bfree, bavail, frsize = (int(field) for field in rest.split())
+    total = blocks * frsize
+    used = (blocks - bfree) * frsize
+    free = bavail * frsize
+    percent = round(used / (used + free) * 100, 1) if used + free else 0.0
+    return int(index), DiskUsage(total, used, free, percent)
+
+
+def start_disk_probes(paths: list[str], timeout: float) -> Callable[[], dict[str, object]]:
+    """Start statvfs for every path concurrently with a per-mount timeout.
+
+    The probes run in a separate process, one thread per mount. A
+    statvfs stuck on a dead NFS or FUSE mount cannot be interrupted and
+    would keep this process from exiting, so at the deadline the probe
+    process is killed instead of waited for.
+
+    Returns:
+        A callable that waits until the shared deadline and returns a
+        mapping of path to usage, or to an OSError. Paths that did not
+        answer in time are absent.
+    """
+    if not paths:
+        return dict
+    proc = subprocess.Popen(
+        [sys.executable, "-I", "-S", "-c", _PROBE_SCRIPT, *paths],
+        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    # Probes run in parallel, so every mount shares the same deadline
+    deadline = time.monotonic() + timeout
+
+    def collect() -> dict[str, object]:
+        output = b""
+        fd = proc.stdout.fileno()
+        try:
+            while True:
+                # Past the deadline, still take whatever already arrived
+                remaining = max(0.0, deadline - time.monotonic())
+                if not select.select([fd], [], [], remaining)[0]:
+                    break
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                output += chunk
+        finally:
+            if proc.poll() is None:
+                # Not reaped here: a process in uninterruptible sleep only
+                # dies once statvfs returns, and subprocess reaps it later
+                proc.kill()
+            proc.stdout.close()
+
+        results: dict[str, object] = {}
+        for line in output.decode(errors="replace").splitlines():
+            try:
+                index, usage = _parse_probe_line(line)
+            except ValueError:
+                continue
+            results[paths[index - 1]] = usage
+        return results
+
+    return collect
+
 
 class SystemStatsWidget(BaseWidget):
     """Displays CPU, memory, and disk usage in two columns."""
 
+    cost = "moderate"
+
+    def __init__(self, config: dict[str, Any], width: int = 80) -> None:
+        super().__init__(config, width)
+        self._cpu_sampled = False
+
     @property
     def name(self) -> str:
         return "system_stats"
@@ -18,8 +128,18 @@ class SystemStatsWidget(BaseWidget):
         gap = self.config.get("column_gap", 4)
         entries = []
 
+        # Start disk probes first so they overlap the CPU sampling interval
         try:
-            cpu_percent = psutil.cpu_percent(interval=0.5)
+            disk_paths = self._disk_paths()
+            disk_probe = start_disk_probes(disk_paths, self.config.get("disk_timeout", 1.0))
+        except Exception:
+            disk_paths = None
+
+        try:
+            # An instance reused by MotdEngine measures since its previous
+            # render instead of sleeping through a fresh sample
+            cpu_percent = psutil.cpu_percent(interval=None if self._cpu_sampled else 0.5)
+            self._cpu_sampled = True
             entries.append(f"CPU:    {cpu_percent:.1f}%")
         except Exception:
             entries.append("CPU:    unavailable")
@@ -33,13 +153,20 @@ class SystemStatsWidget(BaseWidget):
             entries.append("Memory: unavailable")
 
         try:
-            disk_paths = self.config.get("disk_paths", ["/"])
+            if disk_paths is None:
+                raise RuntimeError("disk discovery failed")
+            results = disk_probe()
             for path in disk_paths:
-                disk = psutil.disk_usage(path)
-                used_gb = disk.used / (1024 ** 3)
-                total_gb = disk.total / (1024 ** 3)
                 disk_label = path.rsplit("/", 1)[-1] if "/" in path and path != "/" else path
-                entries.append(f"Disk:   {used_gb:.1f}/{total_gb:.1f} GB ({disk.percent}%) [{disk_label}]")
+                disk = results.get(path)
+                if disk is None:
+                    entries.append(f"Disk:   stale [{disk_label}]")
+                elif isinstance(disk, Exception):
+                    entries.append(f"Disk:   unavailable [{disk_label}]")
+                else:
+                    used_gb = disk.used / (1024 ** 3)
+                    total_gb = disk.total / (1024 ** 3)
+                    entries.append(f"Disk:   {used_gb:.1f}/{total_gb:.1f} GB ({disk.percent}%) [{disk_label}]")
         except Exception:
             entries.append("Disk:   unavailable")
 
@@ -61,3 +188,27 @@ class SystemStatsWidget(BaseWidget):
                 lines.append(left_entry)
 
         return lines
+
+    def _disk_paths(self) -> list[str]:
+        """Return configured mount points, or discover them when set to "auto"."""
+        disk_paths = self.config.get("disk_paths", ["/"])
+        if disk_paths != "auto":
+            return disk_paths
+
+        fstypes = self.config.get("disk_fstypes", DEFAULT_FSTYPES)
+        include = self.config.get("disk_include", ["*"])
+        exclude = self.config.get("disk_exclude", DEFAULT_EXCLUDE)
+
+        # disk_partitions() only parses /proc/mounts, so it cannot hang.
+        # all=True keeps "nodev" filesystems such as NFS and FUSE mounts.
+        paths = []
+        for part in psutil.disk_partitions(all=True):
+            mount = part.mountpoint
+            if part.fstype not in fstypes or mount in paths:
+                continue
+            if not any(fnmatch.fnmatch(mount, pattern) for pattern in include):
+                continue
+            if any(fnmatch.fnmatch(mount, pattern) for pattern in exclude):
+                continue
+            paths.append(mount)
+        return paths
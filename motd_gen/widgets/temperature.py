@@ -1,50 +1,93 @@
 """System temperature widget."""
 
-import psutil
-from motd_gen.widgets.base import BaseWidget
+import hashlib
+import os
+import re
+from motd_gen.cache import load_json, read_boot_id, save_json
+from motd_gen.widgets.base import BaseWidget, RenderFailure
+
+CPU_CHIPS = ("coretemp", "k10temp", "zenpower")
+
+
+def _natural_key(name: str) -> tuple[str, int]:
+    """Sort key so hwmon10 follows hwmon9 and temp10_input follows temp9_input."""
+    match = re.match(r"(\D*)(\d+)", name)
+    if not match:
+        return (name, -1)
+    return (match.group(1), int(match.group(2)))
+
+
+def _read_text(path: str) -> str:
+    """Read a small sysfs attribute, stripped."""
+    with open(path, "r") as f:
+        return f.read().strip()
 
 
 class TemperatureWidget(BaseWidget):
-    """Displays system temperatures from hardware sensors."""
+    """Displays system temperatures from hardware sensors.
+
+    Sensors are discovered by scanning sysfs once; the resulting input
+    paths are cached on disk keyed by boot id and hwmon layout, so a
+    normal render reads a single ``temp*_input`` file.
+    """
 
     @property
     def name(self) -> str:
         return "temperature"
 
     def render(self) -> list[str]:
-        """Read temperatures via psutil sensors."""
+        """Read temperatures from cached sysfs sensor paths."""
         label = self.config.get("label", "Temperature")
         show_all = self.config.get("show_all", False)
         unit = self.config.get("unit", "f")
+        root = self.config.get("sysfs_root", "/sys")
 
         try:
-            temps = psutil.sensors_temperatures()
+            layout = self._resolve(root)
+            try:
+                return self._render_layout(root, layout, label, show_all, unit)
+            except FileNotFoundError:
+                # A cached path vanished (driver reload, hotplug); rescan once
+                layout = self._resolve(root, force=True)
+                return self._render_layout(root, layout, label, show_all, unit)
 
-            if not temps:
-                return [f"{label}: no sensors found"]
+        except Exception as e:
+            return RenderFailure([f"{label}: unavailable ({e})"])
 
-            if show_all:
-                return self._render_all(label, temps, unit)
+    def _render_layout(self, root: str, layout: dict, label: str, show_all: bool,
+                       unit: str) -> list[str]:
+        """Read the sensors a render needs from ``layout`` and format them."""
+        sensors = layout["sensors"]
+        if not sensors:
+            return [f"{label}: no sensors found"]
 
-            # Default: show just the CPU package temp
-            for chip, entries in temps.items():
-                if chip in ("coretemp", "k10temp", "zenpower"):
-                    for entry in entries:
-                        if "package" in entry.label.lower() or "tctl" in entry.label.lower():
-                            temp = self._format_temp(entry.current, unit)
-                            return [f"{label}: {temp}"]
+        if show_all:
+            return self._render_all(label, self._read(sensors), unit)
 
-            # Fallback: first sensor with a reasonable reading
-            for chip, entries in temps.items():
-                for entry in entries:
-                    if entry.current > 0:
-                        temp = self._format_temp(entry.current, unit)
-                        return [f"{label}: {temp} ({chip})"]
+        if layout["primary"] is not None:
+            readings = self._read([sensors[layout["primary"]]])
+            if readings:
+                temp = self._format_temp(readings[0][2], unit)
+                return [f"{label}: {temp}"]
 
-            return [f"{label}: no valid readings"]
+        # Fallback: first sensor with a reasonable reading, read one at a
+        # time. Its index is kept in the layout like ``primary``, so later
+        # renders read just that sensor while it stays valid.
+        fallback = layout.get("fallback")
+        order = list(range(len(sensors)))
+        if fallback in order:
+            order.remove(fallback)
+            order.insert(0, fallback)
+        for i in order:
+            for chip, _, celsius in self._read([sensors[i]]):
+                if celsius > 0:
+                    if i != fallback:
+                        layout["fallback"] = i
+                        save_json(self._cache_name(root), layout)
+                    temp = self._format_temp(celsius, unit)
+                    return [f"{label}: {temp} ({chip})"]
 
-        except Exception as e:
-            return [f"{label}: unavailable ({e})"]
+        return [f"{label}: no valid readings"]
 
     def _format_temp(self, celsius: float, unit: str) -> str:
         """Format temperature in the configured unit."""
@@ -52,14 +95,138 @@ class TemperatureWidget(BaseWidget):
             return f"{celsius * 9/5 + 32:.1f}°F"
         return f"{celsius:.1f}°C"
 
-    def _render_all(self, label: str, temps: dict, unit: str) -> list[str]:
+    def _render_all(self, label: str, readings: list[tuple[str, str, float]], unit: str) -> list[str]:
         """Render all available sensor readings."""
         lines = [f"{label}:"]
-        for chip, entries in temps.items():
+        for chip, sensor_label, celsius in readings:
+            if celsius <= 0:
+                continue
+            name = sensor_label or chip
+            temp = self._format_temp(celsius, unit)
+            lines.append(f"  {name}: {temp}")
+        return lines
+
+    def _read(self, sensors: list[list[str]]) -> list[tuple[str, str, float]]:
+        """Read ``sensors`` as (chip, label, celsius).
+
+        A sensor that is empty, unparsable or fails to read (EIO, ENODATA)
+        is skipped, like psutil does.
+
+        Raises:
+            FileNotFoundError: If a cached input path no longer exists.
+        """
+        readings = []
+        for chip, sensor_label, path in sensors:
+            try:
+                celsius = int(_read_text(path)) / 1000.0
+            except FileNotFoundError:
+                raise
+            except (OSError, ValueError):
+                continue
+            readings.append((chip, sensor_label, celsius))
+        return readings
+
+    def _resolve(self, root: str, force: bool = False) -> dict:
+        """Return the sensor layout, from cache when the hwmon layout is unchanged."""
+        key = self._layout_key(root)
+        cache_name = self._cache_name(root)
+
+        if not force:
+            cached = load_json(cache_name)
+            if isinstance(cached, dict) and cached.get("key") == key:
+                return cached
+
+        sensors = self._scan(root)
+        layout = {
+            "key": key,
+            "sensors": sensors,
+            "primary": self._select_primary(sensors),
+        }
+        save_json(cache_name, layout)
+        return layout
+
+    def _cache_name(self, root: str) -> str:
+        """Layout cache file for a sysfs root, so fixture roots don't clobber /sys."""
+        digest = hashlib.sha1(os.path.abspath(root).encode()).hexdigest()[:12]
+        return f"temperature-{digest}.json"
+
+    def _layout_key(self, root: str) -> str:
+        """Fingerprint the boot and sensor device layout without reading sensors."""
+        parts = [read_boot_id(), os.path.abspath(root)]
+        for subdir in ("hwmon", "thermal"):
+            directory = os.path.join(root, "class", subdir)
+            try:
+                entries = sorted(os.listdir(directory))
+            except OSError:
+                continue
             for entry in entries:
-                if entry.current <= 0:
-                    continue
-                name = entry.label or chip
-                temp = self._format_temp(entry.current, unit)
-                lines.append(f"  {name}: {temp}")
-        return lines
\ No newline at end of file
+                try:
+                    target = os.readlink(os.path.join(directory, entry))
+                except OSError:
+                    target = ""
+                parts.append(f"{entry}>{target}")
+        return "|".join(parts)
+
+    def _select_primary(self, sensors: list[list[str]]) -> int | None:
+        """Pick the CPU package sensor index, matching coretemp/k10temp conventions."""
+        for i, (chip, sensor_label, _) in enumerate(sensors):
+            lowered = sensor_label.lower()
+            if chip in CPU_CHIPS and ("package" in lowered or "tctl" in lowered):
+                return i
+        return None
+
+    def _scan(self, root: str) -> list[list[str]]:
+        """Enumerate hwmon and thermal_zone sensors as [chip, label, input_path]."""
+        sensors = []
+        chips = set()
+
+        hwmon_dir = os.path.join(root, "class", "hwmon")
+        try:
+            hwmons = sorted(os.listdir(hwmon_dir), key=_natural_key)
+        except OSError:
+            hwmons = []
+
+        for hwmon in hwmons:
+            base = os.path.join(hwmon_dir, hwmon)
+            try:
+                chip = _read_text(os.path.join(base, "name"))
+                files = os.listdir(base)
+            except OSError:
+                continue
+
+            inputs = sorted(
+                (f for f in files if f.startswith("temp") and f.endswith("_input")),
+                key=_natural_key,
+            )
+            for input_file in inputs:
+                prefix = input_file[: -len("_input")]
+                sensor_label = ""
+                if f"{prefix}_label" in files:
+                    try:
+                        sensor_label = _read_text(os.path.join(base, f"{prefix}_label"))
+                    except OSError:
+                        pass
+                sensors.append([chip, sensor_label, os.path.join(base, input_file)])
+                chips.add(chip)
+
+        # Thermal zones only add chips that hwmon did not already expose
+        thermal_dir = os.path.join(root, "class", "thermal")
+        try:
+            zones = sorted(
+                (z for z in os.listdir(thermal_dir) if z.startswith("thermal_zone")),
+                key=_natural_key,
+            )
+        except OSError:
+            zones = []
+
+        for zone in zones:
+            base = os.path.join(thermal_dir, zone)
+            try:
+                chip = _read_text(os.path.join(base, "type"))
+            except OSError:
+                continue
+            if chip in chips:
+                continue
+            sensors.append([chip, "", os.path.join(base, "temp")])
+
+        return sensors
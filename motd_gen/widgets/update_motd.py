@@ -0,0 +1,112 @@
+"""Runs legacy update-motd.d scripts concurrently."""
+
+import hashlib
+import os
+import re
+import signal
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from motd_gen.cache import load_json, save_json
+from motd_gen.watch import dependency_token
+from motd_gen.widgets.base import BaseWidget
+
+# Same names run-parts accepts, so editor backups and dpkg leftovers are skipped
+SCRIPT_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def list_scripts(directory: str) -> list[str]:
+    """Executable scripts in ``directory`` in run-parts (byte) order."""
+    try:
+        names = sorted(os.listdir(directory), key=os.fsencode)
+    except OSError:
+        return []
+    paths = []
+    for name in names:
+        path = os.path.join(directory, name)
+        if SCRIPT_NAME.match(name) and os.path.isfile(path) and os.access(path, os.X_OK):
+            paths.append(path)
+    return paths
+
+
+def run_script(path: str, timeout: float) -> str:
+    """Run one script and return its stdout.
+
+    The script gets its own process group so that anything it spawned is
+    killed along with it on timeout.
+
+    Raises:
+        subprocess.TimeoutExpired: If it ran past ``timeout``.
+    """
+    proc = subprocess.Popen(
+        [path], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    try:
+        stdout, _ = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        proc.communicate()
+        raise
+    return stdout.decode(errors="replace")
+
+
+class UpdateMotdWidget(BaseWidget):
+    """Shows the output of /etc/update-motd.d scripts, like pam_motd.
+
+    Scripts run in parallel but their output keeps lexical order. Each
+    script's output is cached until the script changes or its TTL
+    (``script_ttl``, or ``scripts.<name>.ttl``) passes; a script that
+    times out shows its previous output, or nothing.
+    """
+
+    cost = "expensive"
+
+    @property
+    def name(self) -> str:
+        return "update_motd"
+
+    def render(self) -> list[str]:
+        """Run the scripts and concatenate their output."""
+        directory = self.config.get("directory", "/etc/update-motd.d")
+        scripts = list_scripts(directory)
+        if not scripts:
+            return []
+
+        workers = min(len(scripts), self.config.get("max_workers", 16))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outputs = list(executor.map(self._output, scripts))
+
+        lines = []
+        for output in outputs:
+            lines.extend(output.splitlines())
+        return lines
+
+    def _output(self, path: str) -> str:
+        """One script's output, from cache when still valid."""
+        options = self.config.get("scripts", {}).get(os.path.basename(path), {})
+        ttl = options.get("ttl", self.config.get("script_ttl", 0))
+        timeout = options.get("timeout", self.config.get("timeout", 5))
+
+        cache_name = f"update-motd-{hashlib.sha1(path.encode()).hexdigest()[:16]}.json"
+        token = dependency_token([path])
+        entry = load_json(cache_name)
+        if not isinstance(entry, dict) or not isinstance(entry.get("output"), str):
+            entry = None
+        if (entry is not None and ttl > 0 and entry.get("deps") == token
+                and time.time() - entry.get("time", 0) < ttl):
+            return entry["output"]
+
+        try:
+            output = run_script(path, timeout)
+        except subprocess.TimeoutExpired:
+            return entry["output"] if entry is not None else ""
+        except OSError:
+            return ""
+
+        if ttl > 0:
+            save_json(cache_name, {"time": time.time(), "deps": token, "output": output})
+        return output
@@ -1,16 +1,24 @@
 """Available package updates widget."""
 
 import subprocess
-from motd_gen.widgets.base import BaseWidget
+from motd_gen.widgets.base import BaseWidget, RenderFailure
 
 
 class UpdatesWidget(BaseWidget):
     """Displays count of available apt package updates."""
 
+    cache_ttl = 900
+    priority = "low"
+    cost = "expensive"
+
     @property
     def name(self) -> str:
         return "updates"
 
+    def dependencies(self) -> list[str]:
+        # apt update renames fresh lists into place; dpkg rewrites status
+        return ["/var/lib/apt/lists", "/var/lib/dpkg/status"]
+
     def render(self) -> list[str]:
         """Check apt for available updates."""
         label = self.config.get("label", "Updates")
@@ -46,4 +54,4 @@ class UpdatesWidget(BaseWidget):
             return lines
 
         except Exception as e:
-            return [f"{label}: unavailable ({e})"]
\ No newline at end of file
+            return RenderFailure([f"{label}: unavailable ({e})"])
\ No newline at end of file
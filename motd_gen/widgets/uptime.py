@@ -1,7 +1,7 @@
 """System uptime widget."""
 
 from datetime import timedelta
-from motd_gen.widgets.base import BaseWidget
+from motd_gen.widgets.base import BaseWidget, RenderFailure
 
 
 class UptimeWidget(BaseWidget):
@@ -33,4 +33,4 @@ class UptimeWidget(BaseWidget):
             return [f"{label}: {' '.join(parts)}"]
 
         except OSError:
-            return ["Uptime: unavailable"]
+            return RenderFailure(["Uptime: unavailable"])
@@ -1,16 +1,24 @@
 """Logged-in users widget."""
 
 import subprocess
-from motd_gen.widgets.base import BaseWidget
+from motd_gen.widgets.base import BaseWidget, RenderFailure
 
 
 class UsersWidget(BaseWidget):
     """Displays currently logged-in users via loginctl."""
 
+    cache_ttl = 15
+    cost = "moderate"
+    # Output depends on the privileges of whoever renders it
+    per_user = True
+
     @property
     def name(self) -> str:
         return "users"
 
+    def dependencies(self) -> list[str]:
+        return ["/run/systemd/sessions"]
+
     def render(self) -> list[str]:
         """List logged-in users via loginctl."""
         label = self.config.get("label", "Users")
@@ -78,4 +86,4 @@ class UsersWidget(BaseWidget):
             return lines
 
         except Exception as e:
-            return [f"{label}: unavailable ({e})"]
\ No newline at end of file
+            return RenderFailure([f"{label}: unavailable ({e})"])
\ No newline at end of file
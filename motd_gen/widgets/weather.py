@@ -1,7 +1,9 @@
 """Weather widget using Open-Meteo API."""
 
-import requests
-from motd_gen.widgets.base import BaseWidget
+import json
+from typing import Any
+from motd_gen.circuit import CircuitBreaker, CircuitOpenError
+from motd_gen.widgets.base import BaseWidget, RenderFailure
 
 # WMO Weather Interpretation Codes
 # https://open-meteo.com/en/docs
@@ -37,9 +39,20 @@ WMO_CODES: dict[int, str] = {
 }
 
 
+def _requests() -> Any:
+    """Import requests on first use; renders served from the cache never need it."""
+    import requests
+
+    return requests
+
+
 class WeatherWidget(BaseWidget):
     """Displays current weather using Open-Meteo API."""
 
+    cache_ttl = 600
+    priority = "low"
+    cost = "expensive"
+
     API_URL = "https://api.open-meteo.com/v1/forecast"
 
     @property
@@ -60,23 +73,36 @@ class WeatherWidget(BaseWidget):
         wind_unit = "mph" if units == "f" else "km/h"
         precip_unit = "inch" if units == "f" else "mm"
 
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "current": "temperature_2m,relative_humidity_2m,apparent_temperature,weather_code,wind_speed_10m,wind_direction_10m,pressure_msl,uv_index,cloud_cover,precipitation",
+            "daily": "temperature_2m_max,temperature_2m_min,precipitation_probability_max,sunrise,sunset,weather_code",
+            "temperature_unit": temp_unit,
+            "wind_speed_unit": "mph" if units == "f" else "kmh",
+            "precipitation_unit": precip_unit,
+            "timezone": "auto",
+            "forecast_days": 3,
+        }
+
+        breaker = CircuitBreaker(f"weather-{latitude},{longitude}-{units}", self.config)
+        stale = False
+
         try:
-            params = {
-                "latitude": latitude,
-                "longitude": longitude,
-                "current": "temperature_2m,relative_humidity_2m,apparent_temperature,weather_code,wind_speed_10m,wind_direction_10m,pressure_msl,uv_index,cloud_cover,precipitation",
-                "daily": "temperature_2m_max,temperature_2m_min,precipitation_probability_max,sunrise,sunset,weather_code",
-                "temperature_unit": temp_unit,
-                "wind_speed_unit": "mph" if units == "f" else "kmh",
-                "precipitation_unit": precip_unit,
-                "timezone": "auto",
-                "forecast_days": 3,
-            }
-
-            response = requests.get(self.API_URL, params=params, timeout=timeout)
-            response.raise_for_status()
-            data = response.json()
+            data = breaker.call(lambda t: self._fetch(params, t), timeout)
+        except Exception as e:
+            data = breaker.last_value
+            if data is None:
+                if isinstance(e, CircuitOpenError):
+                    return RenderFailure([f"{label}: offline"])
+                if isinstance(e, _requests().ConnectionError):
+                    return RenderFailure([f"{label}: no internet connection"])
+                if isinstance(e, _requests().Timeout):
+                    return RenderFailure([f"{label}: request timed out"])
+                return RenderFailure([f"{label}: unavailable ({e})"])
+            stale = True
 
+        try:
             current = data["current"]
             daily = data["daily"]
 
@@ -97,8 +123,9 @@ class WeatherWidget(BaseWidget):
             sunrise = daily["sunrise"][0].split("T")[1] if daily["sunrise"][0] else "N/A"
             sunset = daily["sunset"][0].split("T")[1] if daily["sunset"][0] else "N/A"
 
+            header = f"{label} (cached {current.get('time', '').replace('T', ' ')}):" if stale else f"{label}:"
             lines = [
-                f"{label}:",
+                header,
                 f"  {desc}, {temp:.0f}{unit_label} (feels {feels:.0f}{unit_label})",
                 f"  Humidity: {humidity}% | Wind: {wind:.0f} {wind_unit} {wind_dir} | Cloud Cover: {cloud_cover}%",
                 f"  Pressure: {pressure:.0f} hPa | UV Index: {uv:.1f} | Precip: {precip:.2f} {precip_unit}",
@@ -128,12 +155,25 @@ class WeatherWidget(BaseWidget):
 
             return lines
 
-        except requests.ConnectionError:
-            return [f"{label}: no internet connection"]
-        except requests.Timeout:
-            return [f"{label}: request timed out"]
         except Exception as e:
-            return [f"{label}: unavailable ({e})"]
+            return RenderFailure([f"{label}: unavailable ({e})"])
+
+    def _fetch(self, params: dict, timeout: float) -> dict:
+        """Request the forecast, via the shared cache server first if configured."""
+        cache_server = self.config.get("cache_server")
+        if cache_server:
+            from motd_gen import cache_client
+
+            server_timeout = min(timeout, self.config.get("cache_server_timeout", 0.5))
+            try:
+                return json.loads(cache_client.fetch(cache_server, "/weather", params, server_timeout))
+            except (cache_client.CacheServerError, ValueError):
+                pass
+
+        http = self.session or _requests()
+        response = http.get(self.API_URL, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
 
     def _wind_direction(self, degrees: float) -> str:
         """Convert wind degrees to compass direction."""
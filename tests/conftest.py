@@ -0,0 +1,58 @@
+"""Shared fixtures: fresh cache directories and a local stand-in for upstream APIs."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+import pytest
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Serves ``server.routes`` ({path: (status, body)}) after ``server.delay``."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        path = urlsplit(self.path).path
+        with self.server.lock:
+            self.server.calls.append(path)
+        time.sleep(self.server.delay)
+        status, body = self.server.routes.get(path, (404, b"not found"))
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Point the per-user cache at a fresh directory."""
+    monkeypatch.setenv("MOTD_GEN_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch, cache_dir):
+    """Point the shared cache at its own fresh directory, apart from cache_dir."""
+    monkeypatch.setenv("MOTD_GEN_SHARED_CACHE_DIR", str(tmp_path / "shared"))
+    return tmp_path / "shared"
+
+
+@pytest.fixture
+def stand_in():
+    """A threaded HTTP server on an ephemeral port; set ``routes`` and ``delay``."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+    server.daemon_threads = True
+    server.routes = {}
+    server.delay = 0.0
+    server.calls = []
+    server.lock = threading.Lock()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,58 @@
+"""Tests for the shared cache server against a stand-in upstream."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from motd_gen import cache_client
+from motd_gen.cache_server import UpstreamCache, make_server
+
+
+@pytest.fixture
+def cache_server(stand_in):
+    stand_in.routes["/forecast"] = (200, b'{"current": {}}')
+    stand_in.routes["/ip"] = (503, b"down")
+    cache = UpstreamCache({"/weather": (f"{stand_in.url}/forecast", 600),
+                           "/public-ip": (f"{stand_in.url}/ip", 300)})
+    server = make_server(cache, listen="127.0.0.1:0")
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _fetch(server, path, params=None):
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    return cache_client.fetch(url, path, params, timeout=5)
+
+
+def test_concurrent_requests_coalesce(cache_server, stand_in):
+    stand_in.delay = 0.3
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        bodies = list(executor.map(lambda _: _fetch(cache_server, "/weather", {"lat": "1"}),
+                                   range(20)))
+
+    assert bodies == [b'{"current": {}}'] * 20
+    assert stand_in.calls == ["/forecast"]
+    stats = cache_server.cache.stats
+    assert stats["misses"] == 1
+    assert stats["coalesced"] + stats["hits"] == 19
+
+
+def test_params_are_separate_keys(cache_server, stand_in):
+    _fetch(cache_server, "/weather", {"lat": "1"})
+    _fetch(cache_server, "/weather", {"lat": "2"})
+    _fetch(cache_server, "/weather", {"lat": "1"})
+    assert stand_in.calls == ["/forecast", "/forecast"]
+
+
+def test_upstream_errors_are_cached_briefly(cache_server, stand_in):
+    for _ in range(3):
+        with pytest.raises(cache_client.CacheServerError):
+            _fetch(cache_server, "/public-ip")
+    assert stand_in.calls == ["/ip"]
+    assert cache_server.cache.stats["upstream_errors"] == 1
+
+
+def test_unknown_endpoint(cache_server):
+    with pytest.raises(cache_client.CacheServerError, match="404"):
+        _fetch(cache_server, "/nope")
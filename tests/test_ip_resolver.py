@@ -0,0 +1,72 @@
+"""Tests for public IP resolution against local stand-in providers."""
+
+import time
+import pytest
+from motd_gen.ip_resolver import PublicIPResolver, _validate
+
+PUBLIC = "93.184.216.34"
+
+
+pytestmark = pytest.mark.usefixtures("cache_dir")
+
+
+def _resolver(stand_in, paths, **config):
+    providers = [{"type": "http", "url": f"{stand_in.url}{path}"} for path in paths]
+    return PublicIPResolver({"providers": providers, "stagger": 0, **config})
+
+
+@pytest.mark.parametrize("address", ["10.1.2.3", "172.16.0.9", "192.168.1.1", "100.64.0.1",
+                                     "127.0.0.1", "169.254.169.254", "203.0.113.10",
+                                     "fd00::1", "fe80::1", "::1", "0.0.0.0"])
+def test_non_global_addresses_are_rejected(address):
+    with pytest.raises(ValueError):
+        _validate(address)
+
+
+def test_global_addresses_are_accepted():
+    assert _validate(f" {PUBLIC}\n") == PUBLIC
+    assert _validate("2606:4700:4700::1111") == "2606:4700:4700::1111"
+
+
+def test_private_answer_loses_to_public_one(stand_in):
+    stand_in.routes = {"/nat": (200, b"100.64.12.34\n"), "/echo": (200, f"{PUBLIC}\n".encode())}
+    assert _resolver(stand_in, ["/nat", "/echo"]).resolve(timeout=5) == PUBLIC
+
+
+def test_failure_starts_the_next_provider_at_once(stand_in):
+    stand_in.routes = {"/down": (503, b"unavailable"), "/echo": (200, PUBLIC.encode())}
+    start = time.monotonic()
+    assert _resolver(stand_in, ["/down", "/echo"], stagger=5).resolve(timeout=10) == PUBLIC
+    assert time.monotonic() - start < 2
+
+
+def test_next_provider_waits_for_the_stagger(stand_in):
+    stand_in.delay = 0.3
+    stand_in.routes = {"/slow": (200, PUBLIC.encode()), "/echo": (200, PUBLIC.encode())}
+    assert _resolver(stand_in, ["/slow", "/echo"], stagger=5).resolve(timeout=10) == PUBLIC
+    assert stand_in.calls == ["/slow"]
+
+
+def test_answer_is_cached_while_the_network_is_unchanged(stand_in):
+    stand_in.routes = {"/echo": (200, PUBLIC.encode())}
+    resolver = _resolver(stand_in, ["/echo"])
+    assert resolver.cached() is None
+    assert resolver.resolve(timeout=5) == PUBLIC
+
+    assert _resolver(stand_in, ["/echo"]).cached() == PUBLIC
+    assert stand_in.calls == ["/echo"]
+
+
+def test_all_providers_failing_raises_an_error(stand_in):
+    stand_in.routes = {"/private": (200, b"192.168.0.2"), "/cgnat": (200, b"100.64.0.7")}
+    with pytest.raises(ValueError, match="not a public address"):
+        _resolver(stand_in, ["/private", "/cgnat"]).resolve(timeout=5)
+
+
+def test_timeout_when_nothing_answers(stand_in):
+    import requests
+
+    stand_in.delay = 1.0
+    stand_in.routes = {"/slow": (200, PUBLIC.encode())}
+    with pytest.raises(requests.Timeout):
+        _resolver(stand_in, ["/slow"]).resolve(timeout=0.2)
@@ -0,0 +1,85 @@
+"""Tests for LastLoginWidget self mode against a synthetic lastlog file."""
+
+import time
+import pytest
+from motd_gen.load_policy import LoadPolicy
+from motd_gen.widgets.last_login import (LASTLOG_RECORD, LastLoginWidget, lastlog_record,
+                                         read_lastlog)
+
+UID = 1000
+
+
+pytestmark = pytest.mark.usefixtures("cache_dir")
+
+
+@pytest.fixture
+def lastlog(tmp_path):
+    path = tmp_path / "lastlog"
+    path.touch()
+    return path
+
+
+def _login(path, login_time, line, host, uid=UID, record=LASTLOG_RECORD):
+    """Overwrite ``uid``'s record, as login does."""
+    with open(path, "r+b") as f:
+        f.seek(uid * record.size)
+        f.write(record.pack(login_time, line.encode(), host.encode()))
+
+
+def _render(path, **config):
+    return LastLoginWidget({"mode": "self", "uid": UID, "lastlog_file": str(path), **config}).render()
+
+
+def _stamp(login_time):
+    return time.strftime("%a %b %d %H:%M", time.localtime(login_time))
+
+
+def test_read_lastlog_is_sparse(lastlog):
+    _login(lastlog, 1_700_000_000, "pts/0", "10.0.0.5")
+    assert read_lastlog(UID, str(lastlog)) == (1_700_000_000, "pts/0", "10.0.0.5")
+    assert read_lastlog(UID - 1, str(lastlog)) is None
+    assert read_lastlog(UID + 1, str(lastlog)) is None
+
+
+@pytest.mark.parametrize("time_bits, size", [(32, 292), (64, 296)])
+def test_record_layouts(lastlog, time_bits, size):
+    record = lastlog_record(time_bits)
+    assert record.size == size
+    _login(lastlog, 1_700_000_000, "pts/0", "10.0.0.5", uid=UID - 1, record=record)
+    _login(lastlog, 1_700_090_000, "tty1", "", record=record)
+
+    assert read_lastlog(UID, str(lastlog), record) == (1_700_090_000, "tty1", "")
+    assert _render(lastlog, record_is_current=False, lastlog_time_bits=time_bits) == [
+        f"Last Login: {_stamp(1_700_090_000)} on tty1"]
+
+
+def test_first_login_has_no_previous(lastlog):
+    _login(lastlog, 1_700_000_000, "pts/0", "10.0.0.5")
+    assert _render(lastlog) == ["Last Login: none recorded"]
+    # Rendering again in the same session still has nothing earlier
+    assert _render(lastlog) == ["Last Login: none recorded"]
+
+
+def test_record_is_current_shows_the_login_before(lastlog):
+    _login(lastlog, 1_700_000_000, "pts/0", "10.0.0.5")
+    _render(lastlog)
+    _login(lastlog, 1_700_090_000, "pts/1", "")
+
+    expected = [f"Last Login: {_stamp(1_700_000_000)} from 10.0.0.5 on pts/0"]
+    assert _render(lastlog) == expected
+    assert _render(lastlog) == expected
+
+
+def test_record_not_current_shows_it_directly(lastlog):
+    _login(lastlog, 1_700_000_000, "tty1", "")
+    assert _render(lastlog, record_is_current=False) == [f"Last Login: {_stamp(1_700_000_000)} on tty1"]
+
+
+def test_never_logged_in(lastlog):
+    assert _render(lastlog, record_is_current=False) == ["Last Login: none recorded"]
+
+
+def test_only_self_mode_escapes_degradation():
+    policy = LoadPolicy({}, readings={"load_per_cpu": 10.0})
+    assert not policy.should_degrade({"type": "last_login", "mode": "self"}, LastLoginWidget)
+    assert policy.should_degrade({"type": "last_login"}, LastLoginWidget)
@@ -0,0 +1,41 @@
+"""Tests for pre-rendered width variants in the shared cache."""
+
+import json
+import os
+import pytest
+from motd_gen.prerender import _cache_name, load_variant, prerender
+
+
+pytestmark = pytest.mark.usefixtures("shared_dir")
+
+
+def _config(tmp_path, *widgets):
+    path = tmp_path / "motd.json"
+    path.write_text(json.dumps({"settings": {}, "widgets": [{"type": "uptime"}, *widgets]}))
+    return str(path)
+
+
+def test_variants_are_shared(tmp_path, shared_dir):
+    config = _config(tmp_path)
+    variants = prerender(config, [80, 120], isolate=False)
+
+    assert (shared_dir / _cache_name(config)).exists()
+    assert load_variant(config, 100, 300) == variants[80]
+    assert load_variant(config, 200, 300) == variants[120]
+
+
+def test_per_user_widgets_keep_variants_per_uid(tmp_path, shared_dir):
+    config = _config(tmp_path, {"type": "users"})
+    variants = prerender(config, [80], isolate=False)
+
+    assert not (shared_dir / _cache_name(config)).exists()
+    assert (shared_dir / _cache_name(config, os.geteuid())).exists()
+    assert load_variant(config, 80, 300) == variants[80]
+
+
+def test_untrusted_variants_are_ignored(tmp_path, shared_dir):
+    config = _config(tmp_path)
+    prerender(config, [80], isolate=False)
+    os.chmod(shared_dir / _cache_name(config), 0o666)
+
+    assert load_variant(config, 80, 300) is None
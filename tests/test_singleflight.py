@@ -0,0 +1,141 @@
+"""Tests for cross-process single-flight rendering."""
+
+import multiprocessing
+import os
+import stat
+import time
+import pytest
+from motd_gen.engine import _render_widget
+from motd_gen.singleflight import cache_key, load_cached, render_single_flight
+from motd_gen.widgets.base import RenderFailure
+from motd_gen.widgets.uptime import UptimeWidget
+
+
+pytestmark = pytest.mark.usefixtures("shared_dir")
+
+
+def _slow_render(log_path):
+    def render():
+        with open(log_path, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        time.sleep(0.5)
+        return ["fresh"]
+    return render
+
+
+def _login(log_path, results):
+    results.put(render_single_flight("widget-test", _slow_render(log_path), ttl=60, wait=5))
+
+
+def test_two_processes_render_once(tmp_path):
+    log_path = tmp_path / "renders.log"
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    logins = [ctx.Process(target=_login, args=(log_path, results)) for _ in range(2)]
+    for process in logins:
+        process.start()
+    for process in logins:
+        process.join(10)
+
+    assert [results.get(timeout=1) for _ in logins] == [["fresh"], ["fresh"]]
+    assert len(log_path.read_text().splitlines()) == 1
+
+
+def test_entries_and_locks_are_readable_by_everyone(cache_dir, shared_dir):
+    old_umask = os.umask(0o077)
+    try:
+        render_single_flight("widget-test", lambda: ["x"], ttl=60)
+    finally:
+        os.umask(old_umask)
+
+    for name in ("widget-test.json", "widget-test.lock"):
+        assert stat.S_IMODE((shared_dir / name).stat().st_mode) == 0o644
+    assert not cache_dir.exists()
+
+
+def test_failures_expire_after_failure_ttl():
+    calls = []
+
+    def render():
+        calls.append(1)
+        return RenderFailure(["Weather: no internet connection"])
+
+    first = render_single_flight("widget-test", render, ttl=600, failure_ttl=60)
+    second = render_single_flight("widget-test", render, ttl=600, failure_ttl=60)
+    assert isinstance(first, RenderFailure) and isinstance(second, RenderFailure)
+    assert len(calls) == 1
+
+    render_single_flight("widget-test", render, ttl=600, failure_ttl=0)
+    assert len(calls) == 2
+
+
+def test_failures_ignore_dependency_tokens(tmp_path):
+    dependency = tmp_path / "status"
+    dependency.write_text("a")
+    calls = []
+
+    def render():
+        calls.append(1)
+        return RenderFailure(["Updates: unavailable"])
+
+    render_single_flight("widget-test", render, ttl=0, dependencies=[str(dependency)],
+                         failure_ttl=0)
+    assert load_cached("widget-test").get("deps") is None
+    render_single_flight("widget-test", render, ttl=0, dependencies=[str(dependency)],
+                         failure_ttl=0)
+    assert len(calls) == 2
+
+
+def test_success_follows_dependencies(tmp_path):
+    dependency = tmp_path / "status"
+    dependency.write_text("a")
+    values = iter([["one"], ["two"]])
+
+    def render():
+        return next(values)
+
+    assert render_single_flight("widget-test", render, ttl=0, dependencies=[str(dependency)]) == ["one"]
+    assert render_single_flight("widget-test", render, ttl=0, dependencies=[str(dependency)]) == ["one"]
+    dependency.write_text("bb")
+    assert render_single_flight("widget-test", render, ttl=0, dependencies=[str(dependency)]) == ["two"]
+
+
+def test_width_only_keys_width_dependent_widgets(shared_dir):
+    uptime = {"type": "uptime", "cache_ttl": 60}
+    assert _render_widget(uptime, 120) == _render_widget(uptime, 80)
+    assert [p.name for p in shared_dir.glob("*.json")] == [f"{cache_key(uptime)}.json"]
+    assert cache_key(uptime, 80) != cache_key(uptime, 120)
+
+
+def test_entries_others_could_write_are_ignored(shared_dir):
+    render_single_flight("widget-test", lambda: ["forged"], ttl=60)
+    os.chmod(shared_dir / "widget-test.json", 0o666)
+
+    assert load_cached("widget-test") is None
+    assert render_single_flight("widget-test", lambda: ["fresh"], ttl=60) == ["fresh"]
+    assert load_cached("widget-test")["lines"] == ["fresh"]
+
+
+def test_per_user_widgets_are_keyed_by_uid(shared_dir, monkeypatch):
+    users = {"type": "users"}
+    for uid in (0, 1000):
+        monkeypatch.setattr(os, "geteuid", lambda: uid)
+        _render_widget(users, 80)
+
+    assert sorted(p.name for p in shared_dir.glob("*.json")) == sorted(
+        f"{cache_key(users, uid=uid)}.json" for uid in (0, 1000))
+
+
+@pytest.mark.parametrize("cache_ttl, renders", [(None, 1), (0, 2)])
+def test_cache_ttl_zero_disables_dependency_caching(tmp_path, monkeypatch, cache_ttl, renders):
+    dependency = tmp_path / "status"
+    dependency.write_text("a")
+    calls = []
+    monkeypatch.setattr(UptimeWidget, "render", lambda self: calls.append(1) or ["Uptime: 1m"])
+    uptime = {"type": "uptime", "dependencies": [str(dependency)]}
+    if cache_ttl is not None:
+        uptime["cache_ttl"] = cache_ttl
+
+    for _ in range(2):
+        _render_widget(uptime, 80)
+    assert len(calls) == renders
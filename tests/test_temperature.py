@@ -0,0 +1,74 @@
+"""Tests for TemperatureWidget against a fixture sysfs tree."""
+
+import pytest
+from motd_gen.widgets import temperature
+from motd_gen.widgets.temperature import TemperatureWidget
+
+
+def _hwmon(root, index, chip, sensors):
+    """Create class/hwmon/hwmon<index> with {"tempN": (label, input)} files."""
+    base = root / "class" / "hwmon" / f"hwmon{index}"
+    base.mkdir(parents=True)
+    (base / "name").write_text(f"{chip}\n")
+    for prefix, (label, value) in sensors.items():
+        if label is not None:
+            (base / f"{prefix}_label").write_text(f"{label}\n")
+        (base / f"{prefix}_input").write_text(value)
+    return base
+
+
+pytestmark = pytest.mark.usefixtures("cache_dir")
+
+
+def _render(root, **config):
+    return TemperatureWidget({"sysfs_root": str(root), "unit": "c", **config}).render()
+
+
+def test_primary_sensor(tmp_path):
+    _hwmon(tmp_path / "sys", 0, "coretemp", {"temp1": ("Package id 0", "52000\n"),
+                                             "temp2": ("Core 0", "50000\n")})
+    assert _render(tmp_path / "sys") == ["Temperature: 52.0°C"]
+
+
+def test_bad_sensors_are_skipped(tmp_path):
+    root = tmp_path / "sys"
+    _hwmon(root, 0, "coretemp", {"temp1": ("Package id 0", ""),
+                                 "temp2": ("Core 0", "not a number\n"),
+                                 "temp3": ("Core 1", "47000\n")})
+    assert _render(root) == ["Temperature: 47.0°C (coretemp)"]
+    assert _render(root, show_all=True) == ["Temperature:", "  Core 1: 47.0°C"]
+
+
+def test_fallback_sensor_is_remembered(tmp_path, monkeypatch):
+    root = tmp_path / "sys"
+    _hwmon(root, 0, "acpitz", {"temp1": (None, "0\n")})
+    _hwmon(root, 1, "cpu_thermal", {"temp1": (None, "45000\n"), "temp2": (None, "46000\n")})
+    assert _render(root) == ["Temperature: 45.0°C (cpu_thermal)"]
+
+    reads = []
+    real_read_text = temperature._read_text
+    monkeypatch.setattr(temperature, "_read_text", lambda path: reads.append(path) or real_read_text(path))
+    assert _render(root) == ["Temperature: 45.0°C (cpu_thermal)"]
+    assert reads == [str(root / "class" / "hwmon" / "hwmon1" / "temp1_input")]
+
+
+def test_vanished_path_triggers_rescan(tmp_path):
+    root = tmp_path / "sys"
+    base = _hwmon(root, 0, "coretemp", {"temp1": ("Package id 0", "52000\n"),
+                                        "temp2": ("Core 0", "50000\n")})
+    assert _render(root) == ["Temperature: 52.0°C"]
+
+    # Same hwmon layout, so only the missing file can force the rescan
+    (base / "temp1_input").unlink()
+    (base / "temp1_label").unlink()
+    assert _render(root) == ["Temperature: 50.0°C (coretemp)"]
+
+
+def test_roots_have_separate_caches(tmp_path, cache_dir):
+    _hwmon(tmp_path / "a", 0, "coretemp", {"temp1": ("Package id 0", "40000\n")})
+    _hwmon(tmp_path / "b", 0, "k10temp", {"temp1": ("Tctl", "60000\n")})
+
+    assert _render(tmp_path / "a") == ["Temperature: 40.0°C"]
+    assert _render(tmp_path / "b") == ["Temperature: 60.0°C"]
+    assert len(list(cache_dir.glob("temperature-*.json"))) == 2
+    assert _render(tmp_path / "a") == ["Temperature: 40.0°C"]
@@ -0,0 +1,39 @@
+"""Tests for the SGR optimizer."""
+
+from motd_gen.terminal import optimize_sgr
+
+BOLD, RED, UNDERLINE, RESET = "\033[1m", "\033[31m", "\033[4m", "\033[0m"
+
+
+def test_plain_text_unchanged():
+    text = "Welcome to host\n  load: 0.10 0.05 0.01\n"
+    assert optimize_sgr(text) == text
+
+
+def test_adjacent_codes_merge():
+    assert optimize_sgr(f"{BOLD}{RED}hi{RESET}") == "\033[1;31mhi\033[0m"
+
+
+def test_repeated_prefix_reset_pairs_merge():
+    text = f"{RED}a{RESET}{RED}b{RESET}\n{RED}c{RESET}"
+    assert optimize_sgr(text) == f"{RED}ab\nc{RESET}"
+
+
+def test_redundant_resets_collapse():
+    assert optimize_sgr(f"{RESET}{RESET}x{RESET}") == "x"
+    assert optimize_sgr(f"{RED}{RESET}x") == "x"
+
+
+def test_invisible_whitespace_keeps_state():
+    assert optimize_sgr(f"{BOLD}A{RESET} {BOLD}B{RESET}") == f"{BOLD}A B{RESET}"
+    # Underline shows on spaces, so the gap must really be reset
+    text = f"{UNDERLINE}A{RESET} {UNDERLINE}B{RESET}"
+    assert optimize_sgr(text) == text
+
+
+def test_unterminated_state_is_reset():
+    assert optimize_sgr(f"{RED}x") == f"{RED}x{RESET}"
+
+
+def test_no_colors_strips_sequences():
+    assert optimize_sgr(f"{BOLD}{RED}x{RESET}", colors=0) == "x"
@@ -0,0 +1,54 @@
+"""Tests for dependency tokens."""
+
+import pytest
+from motd_gen import watch
+
+
+@pytest.fixture
+def inotify():
+    try:
+        tracker = watch.InotifyTracker()
+    except (OSError, AttributeError):
+        pytest.skip("inotify unavailable")
+    yield tracker
+    tracker.close()
+
+
+def _assert_token_follows_file(tracker, tmp_path):
+    path = tmp_path / "status"
+    path.write_text("a")
+    before = tracker.token([str(path)])
+    assert tracker.token([str(path)]) == before
+
+    path.write_text("bb")
+    assert tracker.token([str(path)]) != before
+
+
+def test_stat_token_changes_with_the_file(tmp_path):
+    _assert_token_follows_file(watch.StatTracker(), tmp_path)
+
+
+def test_inotify_token_changes_with_the_file(tmp_path, inotify):
+    _assert_token_follows_file(inotify, tmp_path)
+
+
+def test_missing_dependencies_have_no_token(tmp_path):
+    assert watch.StatTracker().token([str(tmp_path / "missing")]) is None
+
+
+def test_queue_overflow_forgets_every_entry(tmp_path, inotify, monkeypatch):
+    path = tmp_path / "status"
+    path.write_text("a")
+    inotify.token([str(path)])
+    assert inotify._entries
+
+    events = [watch._EVENT_HEADER.pack(-1, 0x4000, 0, 0)]
+
+    def read(fd, size):
+        if events:
+            return events.pop()
+        raise BlockingIOError
+
+    monkeypatch.setattr(watch.os, "read", read)
+    inotify._drain()
+    assert not inotify._entries